@@ -0,0 +1,513 @@
+"""
+Headless benchmark for the dashboard
+Generates production-scale synthetic data, drives streamlit_app.py through Streamlit's AppTest
+against the local JSON path (no Supabase, no network) and reports p50/p95 rerun time and
+peak memory per section.
+
+    python scripts/benchmark.py                          # full run, prints a table
+    python scripts/benchmark.py --runs 10 --output results.json
+    python scripts/benchmark.py --baseline results.json  # exit 1 if any p95 regressed
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pytz
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+APP_FILE = REPO_DIR / "streamlit_app.py"
+DRIVER_FILE = "benchmark_app.py"
+
+# AppTest entry point written next to the copied app. It runs the dashboard with
+# SectionTimer also recording each load and render's peak memory while tracemalloc
+# is tracing, so the dashboard itself never has to check for it.
+DRIVER_SOURCE = '''\
+import runpy
+import tracemalloc
+from pathlib import Path
+
+app = runpy.run_path(str(Path(__file__).with_name("streamlit_app.py")), run_name="streamlit_app")
+measure = app["SectionTimer"]._measure
+
+
+def measure_memory(self, record, step, func, *args):
+    if not tracemalloc.is_tracing():
+        return measure(self, record, step, func, *args)
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = measure(self, record, step, func, *args)
+    record[f"{step}_peak_kb"] = round((tracemalloc.get_traced_memory()[1] - baseline) / 1024, 1)
+    return result
+
+
+app["SectionTimer"]._measure = measure_memory
+app["main"]()
+'''
+
+# Dashboard section -> its visibility checkbox key in the sidebar
+SECTION_KEYS = {
+    "Daily Context": "show_daily_context",
+    "Environment": "show_environment",
+    "Risk Assessment": "show_risk",
+    "Opening Range": "show_opening_range",
+    "Initial Balance": "show_ib",
+    "3-Stage Progression": "show_stage_progression",
+    "TPO Profile": "show_tpo_profile",
+    "Single Prints": "show_sp",
+    "Gap Stats": "show_gap",
+}
+
+# Small dict payloads are taken as-is from the sample data
+STATIC_FILES = ("daily_context.json", "market_environment.json", "risk_assessment.json", "opening_range.json")
+
+SYMBOL_PRICES = {"NQ": 20500.0, "ES": 5900.0}
+GAP_CATEGORIES = ((10, "Micro"), (25, "Small"), (50, "Medium"), (75, "Large"), (float("inf"), "Extreme"))
+ALERT_TYPES = (
+    ("Price Level", "critical", "Price approaching prior day high ({price:.2f})"),
+    ("IB Extension", "critical", "50% IB extension reached at {price:.2f}"),
+    ("Single Print", "warning", "Price approaching single print at {price:.2f}"),
+    ("Gap Fill", "warning", "Gap fill target {price:.2f} in play"),
+    ("Volume", "info", "Volume spike near {price:.2f}"),
+)
+
+
+# ========================================
+# SYNTHETIC DATA
+# ========================================
+
+def trading_days(end, count):
+    """The last `count` weekdays up to and including `end`, oldest first"""
+    days = []
+    day = end
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+def generate_gaps(rng, days, symbol):
+    """One gap per trading day, oldest first (same layout as data/gap_details.json)"""
+    price = SYMBOL_PRICES[symbol]
+    rows = []
+    for day in days:
+        atr = round(price * rng.uniform(0.008, 0.02), 2)
+        prior_high = round(price + atr * rng.uniform(0.1, 0.5), 2)
+        prior_low = round(price - atr * rng.uniform(0.1, 0.5), 2)
+        direction = rng.choice(("Up", "Down"))
+        gap_size = round(abs(rng.gauss(0, atr * 0.3)) + 0.25, 2)
+        current_open = prior_high + gap_size if direction == "Up" else prior_low - gap_size
+        gap_pct_atr = gap_size / atr * 100
+        filled = rng.random() < max(0.2, 0.9 - gap_pct_atr / 150)
+        fill_minutes = int(rng.expovariate(1 / 40)) if filled else None
+        fill_time = (datetime(2000, 1, 1, 9, 30) + timedelta(minutes=fill_minutes)).strftime("%H:%M:%S.%f") if filled else None
+        rows.append({
+            "date": day.strftime("%Y-%m-%d"),
+            "prior_day_high": prior_high,
+            "prior_day_low": prior_low,
+            "current_open": round(current_open, 2),
+            "gap_size": gap_size,
+            "gap_fill_target": prior_high if direction == "Up" else prior_low,
+            "atr": atr,
+            "gap_pct_atr": gap_pct_atr,
+            "category": next(name for limit, name in GAP_CATEGORIES if gap_pct_atr < limit),
+            "direction": direction,
+            "pivot_high": round(prior_high + atr * 0.1, 2),
+            "pivot_low": round(prior_low - atr * 0.3, 2),
+            "range_position": rng.choice(("Above", "Within", "Below")),
+            "filled": filled,
+            "fill_time": fill_time,
+            "minutes_to_fill": fill_minutes,
+            "fill_bar_index": fill_minutes // 5 if filled else None,
+        })
+        price = max(price * (1 + rng.gauss(0, 0.012)), 100.0)
+    return rows
+
+
+def generate_ib(rng, days, symbols):
+    """One IB row per trading day per symbol, newest first (same layout as data/ib_details.json)"""
+    rows = []
+    for day in reversed(days):
+        for symbol in symbols:
+            price = SYMBOL_PRICES[symbol]
+            atr = round(price * rng.uniform(0.008, 0.02), 2)
+            ib_range = round(atr * rng.uniform(0.1, 0.6), 2)
+            ib_low = round(price - ib_range / 2, 2)
+            ib_high = round(ib_low + ib_range, 2)
+            extension = round(max(rng.gauss(40, 50), 0), 1)
+            rows.append({
+                "date": day.strftime("%Y-%m-%d"),
+                "symbol": symbol,
+                "ib_high": ib_high,
+                "ib_low": ib_low,
+                "ib_range": ib_range,
+                "atr": atr,
+                "ib_pct_atr": round(ib_range / atr * 100, 2),
+                "current_price": round(ib_high + ib_range * extension / 100, 2),
+                "extension_30_level": round(ib_high + ib_range * 0.3, 2),
+                "extension_50_level": round(ib_high + ib_range * 0.5, 2),
+                "extension_100_level": round(ib_high + ib_range, 2),
+                "current_extension_pct": extension,
+                "reached_30": extension >= 30,
+                "reached_50": extension >= 50,
+                "reached_100": extension >= 100,
+                "time_to_30": rng.randint(5, 200) if extension >= 30 else None,
+                "time_to_50": rng.randint(30, 300) if extension >= 50 else None,
+                "direction": "Up" if extension > 0 else "Contained",
+            })
+    return rows
+
+
+def generate_single_prints(rng, days, symbols, count):
+    """`count` single prints spread over the history, newest first"""
+    end = days[-1]
+    rows = []
+    for _ in range(count):
+        symbol = rng.choice(symbols)
+        formed = rng.choice(days)
+        current = SYMBOL_PRICES[symbol]
+        level = round(current + rng.gauss(0, current * 0.03) * 4) / 4
+        filled = rng.random() < 0.7
+        rows.append({
+            "date_formed": formed.strftime("%Y-%m-%d"),
+            "symbol": symbol,
+            "price_level": level,
+            "session": rng.choice(("RTH", "ETH")),
+            "age_days": (end - formed).days,
+            "current_price": current,
+            "distance_from_current": round(abs(current - level), 2),
+            "filled": filled,
+            "fill_date": (formed + timedelta(days=rng.randint(0, 30))).strftime("%Y-%m-%d") if filled else None,
+            "fill_time_minutes": rng.randint(1, 40000) if filled else None,
+            "direction_from_current": "Below" if level < current else "Above",
+        })
+    rows.sort(key=lambda row: row["date_formed"], reverse=True)
+    return rows
+
+
+def generate_stage_progression(rng, now, count=50):
+    statuses = ("active", "completed", "failed")
+    rows = []
+    for i in range(count):
+        stage = rng.randint(1, 3)
+        times = [(now - timedelta(minutes=rng.randint(0, 360))).strftime("%Y-%m-%dT%H:%M:%S") for _ in range(stage)]
+        times += [None] * (3 - stage)
+        price = SYMBOL_PRICES["NQ"] + rng.gauss(0, 150)
+        rows.append({
+            "level_name": f"Level {i + 1}",
+            "price": round(price, 2),
+            "current_stage": stage,
+            "stage_1_time": times[0],
+            "stage_2_time": times[1],
+            "stage_3_time": times[2],
+            "status": rng.choice(statuses),
+            "direction": rng.choice(("testing_above", "testing_below", "accepted_above", "rejected_below")),
+            "distance_to_price": round(price - SYMBOL_PRICES["NQ"], 2),
+            "timeframe": rng.choice(("5MIN", "30MIN", "4HR")),
+            "context": "Synthetic level for benchmarking.",
+        })
+    return rows
+
+
+def generate_tpo_profile(rng, days, profile_days):
+    """Today's profile plus `profile_days` prior session profiles (only today's is rendered)"""
+    def profile(day):
+        low = SYMBOL_PRICES["NQ"] + rng.gauss(0, 200)
+        high = low + rng.uniform(80, 400)
+        val = low + (high - low) * 0.25
+        vah = low + (high - low) * 0.75
+        ticks = np.arange(low, high, 0.25)
+        return {
+            "timestamp": f"{day:%Y-%m-%d}T16:00:00",
+            "symbol": "NQ",
+            "date": day.strftime("%Y-%m-%d"),
+            "session": "RTH",
+            "profile_type": rng.choice(("Normal", "Trend", "Double Distribution")),
+            "shape": rng.choice(("P-shaped", "b-shaped", "D-shaped")),
+            "poc": round((val + vah) / 2, 2),
+            "value_area_high": round(vah, 2),
+            "value_area_low": round(val, 2),
+            "value_area_pct": 70,
+            "high": round(high, 2),
+            "low": round(low, 2),
+            "range": round(high - low, 2),
+            "initial_balance_high": round(low + (high - low) * 0.6, 2),
+            "initial_balance_low": round(low + (high - low) * 0.3, 2),
+            "tpo_count": {"above_value": rng.randint(0, 20), "in_value": rng.randint(10, 40), "below_value": rng.randint(0, 20)},
+            "letters": {f"{price:.2f}": "".join(rng.sample("ABCDEFGHIJKLM", rng.randint(1, 13))) for price in ticks},
+            "structure": {
+                "single_prints_above": [round(p, 2) for p in ticks[-rng.randint(0, 12):]],
+                "single_prints_below": [round(p, 2) for p in ticks[:rng.randint(0, 12)]],
+                "poor_highs": [],
+                "poor_lows": [round(low, 2)],
+            },
+            "context": "Synthetic profile for benchmarking.",
+            "trading_implications": ["Synthetic implication"] * 3,
+        }
+
+    today = profile(days[-1])
+    today["profiles"] = [profile(day) for day in days[-profile_days - 1:-1]]
+    return today
+
+
+def generate_alerts(rng, symbol, count, now, span):
+    """`count` alerts for one symbol, evenly spread over `span` up to `now`, oldest first"""
+    step = span / count
+    start = now - span
+    lines = []
+    for i in range(count):
+        alert_type, priority, message = rng.choice(ALERT_TYPES)
+        price = SYMBOL_PRICES[symbol] + rng.gauss(0, 50)
+        lines.append(json.dumps({
+            "timestamp": (start + step * (i + 1)).strftime("%Y-%m-%dT%H:%M:%S"),
+            "symbol": symbol,
+            "type": alert_type,
+            "priority": priority,
+            "message": message.format(price=price),
+            "price": round(price, 2),
+        }))
+    return "\n".join(lines) + "\n"
+
+
+def build_workdir(workdir, args):
+    """Copy the app next to a synthetic data/ directory and alert logs, the way it is deployed"""
+    rng = random.Random(args.seed)
+    now = datetime.now(pytz.timezone("US/Eastern")).replace(tzinfo=None)
+    days = trading_days(now, args.years * 252)
+    symbols = tuple(SYMBOL_PRICES)
+
+    data_dir = workdir / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copy(APP_FILE, workdir / APP_FILE.name)
+    (workdir / DRIVER_FILE).write_text(DRIVER_SOURCE)
+    for name in STATIC_FILES:
+        shutil.copy(REPO_DIR / "data" / name, data_dir / name)
+
+    payloads = {
+        # The dashboard reads a single gap file, so it gets the full history of one symbol
+        "gap_details.json": generate_gaps(rng, days, "NQ"),
+        "ib_details.json": generate_ib(rng, days, symbols),
+        "single_prints.json": generate_single_prints(rng, days, symbols, args.single_prints),
+        "stage_progression.json": generate_stage_progression(rng, now),
+        "tpo_profile.json": generate_tpo_profile(rng, days, args.tpo_days),
+    }
+    for name, payload in payloads.items():
+        (data_dir / name).write_text(json.dumps(payload))
+
+    # Alerts go in the append-only logs the dashboard reads from its working directory
+    per_symbol = args.alerts // len(symbols)
+    for symbol in symbols:
+        log = generate_alerts(rng, symbol, per_symbol, now, timedelta(days=args.alert_days))
+        (workdir / f"alerts_{symbol.lower()}.jsonl").write_text(log)
+
+    sizes = {name: len(payload) for name, payload in payloads.items() if isinstance(payload, list)}
+    sizes["tpo_profile.json"] = 1 + args.tpo_days
+    sizes["alerts"] = per_symbol * len(symbols)
+    return sizes
+
+
+# ========================================
+# BENCHMARK
+# ========================================
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 2) if values else None
+
+
+def set_visible(at, visible):
+    """Show only the sections in `visible` on the next rerun"""
+    for section, key in SECTION_KEYS.items():
+        at.session_state[key] = section in visible
+
+
+def clear_caches():
+    """Empty st.cache_data and st.cache_resource (which holds the loaders' stale-while-revalidate cache)"""
+    import streamlit as st
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def run_scenario(at, visible, runs, memory_runs, cold):
+    """Rerun the app with only `visible` sections shown, timing every rerun.
+
+    Timed reruns run without tracemalloc (it slows Python down several times over);
+    peak memory comes from separate traced reruns. The whole-rerun peak includes
+    compiling the app script on every AppTest run; the per-section peaks come from
+    the SectionTimer patched in by DRIVER_SOURCE, which measures each load and render while tracing.
+    """
+    set_visible(at, visible)
+    at.run()  # Warm-up: widget state settles and caches fill
+    check_exceptions(at)
+
+    rerun_ms = []
+    timings = {}
+    for _ in range(runs):
+        if cold:
+            clear_caches()
+        start = perf_counter()
+        at.run()
+        rerun_ms.append((perf_counter() - start) * 1000)
+        check_exceptions(at)
+        for name, record in section_records(at, visible):
+            section = timings.setdefault(name, {"load_ms": [], "render_ms": []})
+            for field in section:
+                if record.get(field) is not None:
+                    section[field].append(record[field])
+
+    peaks = []
+    section_peaks = {}
+    tracemalloc.start()
+    try:
+        for _ in range(memory_runs):
+            if cold:
+                clear_caches()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            at.run()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            for name, record in section_records(at, visible):
+                peak_kb = max(record.get("load_peak_kb", 0), record.get("render_peak_kb", 0))
+                section_peaks[name] = max(section_peaks.get(name, 0), peak_kb)
+    finally:
+        tracemalloc.stop()
+
+    sections = {}
+    for name, section in timings.items():
+        sections[name] = {field: {"p50": percentile(values, 50), "p95": percentile(values, 95)} for field, values in section.items()}
+        sections[name]["peak_memory_mb"] = round(section_peaks[name] / 1024, 2) if name in section_peaks else None
+
+    return {
+        "rerun_ms": {"p50": percentile(rerun_ms, 50), "p95": percentile(rerun_ms, 95)},
+        "peak_memory_mb": round(max(peaks) / 2**20, 2) if peaks else None,
+        "sections": sections,
+    }
+
+
+def section_records(at, visible):
+    """The dashboard's timing records for the sections shown in this scenario (alerts always are)"""
+    for name, record in at.session_state["section_metrics"].items():
+        if name in visible or name.endswith("Alerts"):
+            yield name, record
+
+
+def check_exceptions(at):
+    if at.exception:
+        raise RuntimeError(f"Dashboard raised: {at.exception[0].value}")
+
+
+def run_benchmark(workdir, args):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(workdir / DRIVER_FILE), default_timeout=args.timeout)
+
+    scenarios = {"Full page": tuple(SECTION_KEYS), "Alerts only": ()}
+    scenarios.update({section: (section,) for section in SECTION_KEYS})
+
+    results = {}
+    for name, visible in scenarios.items():
+        print(f"⏱️  {name}...", flush=True)
+        results[name] = run_scenario(at, visible, args.runs, args.memory_runs, args.cold)
+    return results
+
+
+def print_results(results):
+    print()
+    print("Rerun time with only the named section shown (peak MB = that section's load/render peak):")
+    print(f"{'Scenario':<22}{'p50 ms':>10}{'p95 ms':>10}{'peak MB':>10}{'rerun MB':>10}")
+    for name, result in results.items():
+        rerun = result["rerun_ms"]
+        section_peak = result["sections"].get(name, {}).get("peak_memory_mb")
+        section_peak = f"{section_peak:>10.2f}" if section_peak is not None else f"{'-':>10}"
+        print(f"{name:<22}{rerun['p50']:>10.1f}{rerun['p95']:>10.1f}{section_peak}{result['peak_memory_mb']:>10.1f}")
+
+    print()
+    print("Full page, per section:")
+    print(f"{'Section':<22}{'load p50':>10}{'load p95':>10}{'render p50':>12}{'render p95':>12}{'peak MB':>10}")
+    for name, timings in results["Full page"]["sections"].items():
+        load, render = timings["load_ms"], timings["render_ms"]
+        peak = timings["peak_memory_mb"] if timings["peak_memory_mb"] is not None else float("nan")
+        print(f"{name:<22}{load['p50']:>10.2f}{load['p95']:>10.2f}{render['p50']:>12.2f}{render['p95']:>12.2f}{peak:>10.2f}")
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Scenarios whose p95 rerun time grew by more than `tolerance` over the baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("scenarios", {}).get(name, {}).get("rerun_ms", {}).get("p95")
+        after = result["rerun_ms"]["p95"]
+        if before and after > before * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before:.1f} ms -> {after:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="timed reruns per scenario")
+    parser.add_argument("--memory-runs", type=int, default=3, help="traced reruns per scenario for peak memory")
+    parser.add_argument("--cold", action="store_true", help="clear the dashboard's caches before every rerun")
+    parser.add_argument("--years", type=int, default=10, help="years of gap and IB history")
+    parser.add_argument("--alerts", type=int, default=50000, help="total alerts across NQ and ES")
+    parser.add_argument("--alert-days", type=int, default=30, help="days the alerts are spread over, ending now")
+    parser.add_argument("--single-prints", type=int, default=5000, help="single print rows")
+    parser.add_argument("--tpo-days", type=int, default=20, help="prior session profiles in the TPO payload")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--phase", default="rth", choices=("premarket", "opening_range", "initial_balance", "rth", "closed"),
+                        help="market phase whose refresh schedule the dashboard uses")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument("--workdir", help="keep the generated app and data here instead of a temp dir")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier --output file to compare p95 rerun times against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth over the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir).resolve() if args.workdir else Path(tempfile.mkdtemp(prefix="tt_stats_bench_"))
+    cwd = os.getcwd()
+    try:
+        sizes = build_workdir(workdir, args)
+        print(f"📦 Synthetic data in {workdir}: {sizes}")
+        print(f"🕒 Refresh schedule pinned to the {args.phase} market phase")
+        os.environ["MARKET_PHASE"] = args.phase  # AppTest runs the app in this process
+
+        # Relative alert paths and the local JSON fallback resolve against the working directory
+        os.chdir(workdir)
+        results = run_benchmark(workdir, args)
+    finally:
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results)
+
+    report = {
+        "generated_at": datetime.now(pytz.utc).isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "workdir")},
+        "data": sizes,
+        "scenarios": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("\n✅ No p95 regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
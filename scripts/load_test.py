@@ -0,0 +1,391 @@
+"""
+Concurrent-session load test for the dashboard
+Starts the local PostgREST stand-in (scripts/mock_postgrest.py) and a real `streamlit run`
+server pointed at it, then connects N headless sessions over Streamlit's websocket protocol.
+Each session reruns the alert panel and the sections on the cadences the app asks for
+(1 s alerts, 5 s sections with auto-refresh on), the way a browser tab does.
+
+For every N it reports rerun latency percentiles, how far the 1 s alert refresh fell
+behind, backend request rate against the mock, and the server's CPU and memory.
+Runs on one Linux box with no network (CPU/memory come from /proc).
+
+    python scripts/load_test.py --sessions 1,5,10,25 --duration 30 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytz
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_postgrest import MockPostgrestServer, DATA_DIR, add_fault_arguments, faults_from_args
+
+APP_FILE = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+AUTO_REFRESH_LABEL = "Enable Auto-Refresh"
+ALERTS_KEPT = 100  # Same cap the test_*_alert.py writers use
+MARKET_PHASES = ("premarket", "opening_range", "initial_balance", "rth", "closed")
+
+
+# ========================================
+# SERVER UNDER TEST
+# ========================================
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_dashboard(workdir, mock_url, port, phase):
+    """`streamlit run` the app with secrets pointing at the mock; realtime off (the mock has none).
+
+    The refresh schedule is pinned to `phase` so results don't depend on when the test runs.
+    """
+    streamlit_dir = workdir / ".streamlit"
+    streamlit_dir.mkdir(parents=True, exist_ok=True)
+    (streamlit_dir / "secrets.toml").write_text(
+        f'SUPABASE_URL = "{mock_url}"\n'
+        'SUPABASE_KEY = "mock-key"\n'
+        'CHANGE_FEED = "off"\n'
+        f'MARKET_PHASE = "{phase}"\n'
+        f'HISTORY_CACHE_DIR = "{workdir / "history"}"\n'
+    )
+    log = open(workdir / "server.log", "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(APP_FILE),
+         "--server.port", str(port), "--server.headless", "true",
+         "--server.enableXsrfProtection", "false", "--browser.gatherUsageStats", "false"],
+        cwd=workdir, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Dashboard exited early, see {workdir / 'server.log'}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.25)
+    process.kill()
+    raise RuntimeError("Dashboard did not become healthy within 60 s")
+
+
+class ProcessSampler:
+    """CPU time and resident memory of one process, read from /proc"""
+
+    TICKS = os.sysconf("SC_CLK_TCK")
+
+    def __init__(self, pid):
+        self.pid = pid
+
+    def cpu_seconds(self):
+        fields = Path(f"/proc/{self.pid}/stat").read_text().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.TICKS  # utime + stime
+
+    def rss_mb(self):
+        for line in Path(f"/proc/{self.pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+        return 0.0
+
+
+def write_alerts(store, symbol, count):
+    """Prepend `count` alerts to a symbol's blob, as the Sierra Chart writers do every tick"""
+    table_name = f"alerts_{symbol.lower()}"
+    rows = store.select(table_name, [("id", "eq", "1")])
+    alerts = rows[0]["data"] if rows else []
+    now = datetime.now(pytz.timezone("US/Eastern")).strftime("%Y-%m-%dT%H:%M:%S")
+    new_alerts = [{
+        "timestamp": now, "symbol": symbol, "type": "Load Test", "priority": random.choice(("critical", "warning", "info")),
+        "message": f"Synthetic alert {random.randrange(10**6)}", "price": 20000.0 + random.random() * 100,
+    } for _ in range(count)]
+    store.upsert(table_name, [{"id": 1, "data": (new_alerts + alerts)[:ALERTS_KEPT]}])
+
+
+async def alert_writer(store, interval, stop):
+    while not stop.is_set():
+        for symbol in ("NQ", "ES"):
+            write_alerts(store, symbol, 1)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ========================================
+# HEADLESS SESSIONS
+# ========================================
+
+class Session:
+    """One browser tab: a websocket to the server that reruns fragments on their run_every cadence"""
+
+    def __init__(self, url, stats, auto_refresh):
+        self.url = url
+        self.stats = stats
+        self.auto_refresh = auto_refresh
+        self.fragments = {}  # fragment_id -> run_every seconds
+        self.widget_states = None
+        self._finished = None
+        self._ws = None
+
+    async def run(self, stop):
+        async with websockets.connect(self.url, subprotocols=["streamlit"], max_size=None, ping_interval=None) as ws:
+            self._ws = ws
+            receiver = asyncio.create_task(self._receive())
+            try:
+                await self._rerun("full")
+                if self.auto_refresh and self.widget_states is not None:
+                    await self._rerun("full")  # Submits the checkbox so the sections fragment gets its run_every
+                await self._auto_rerun(stop)
+            finally:
+                receiver.cancel()
+
+    async def _auto_rerun(self, stop):
+        loop = asyncio.get_running_loop()
+        next_due = {fragment_id: loop.time() + interval * random.random() for fragment_id, interval in self.fragments.items()}
+        while not stop.is_set() and next_due:
+            fragment_id = min(next_due, key=next_due.get)
+            due = next_due[fragment_id]
+            try:
+                await asyncio.wait_for(stop.wait(), max(0.0, due - loop.time()))
+                return
+            except asyncio.TimeoutError:
+                pass
+            if fragment_id not in self.fragments:
+                next_due.pop(fragment_id)
+                continue
+
+            interval = self.fragments[fragment_id]
+            name = f"fragment every {interval:g}s"
+            self.stats.lag(name, loop.time() - due)
+            await self._rerun(name, fragment_id)
+
+            # Ticks that came and went while this rerun was still running are missed refreshes
+            next_due[fragment_id] = due + interval
+            while next_due[fragment_id] < loop.time():
+                next_due[fragment_id] += interval
+                self.stats.missed(name)
+            for new_id in self.fragments.keys() - next_due.keys():
+                next_due[new_id] = loop.time() + self.fragments[new_id]
+
+    async def _rerun(self, name, fragment_id=None):
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.SetInParent()  # Selects rerun_script even when no field below gets set
+        if self.widget_states is not None:
+            client_state.widget_states.CopyFrom(self.widget_states)
+        if fragment_id:
+            client_state.fragment_id = fragment_id
+            client_state.is_auto_rerun = True
+
+        self._finished = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self._ws.send(message.SerializeToString())
+        await self._finished
+        self.stats.rerun(name, time.perf_counter() - start)
+
+    async def _receive(self):
+        async for raw in self._ws:
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._on_element(msg.delta.new_element)
+            elif kind == "auto_rerun":
+                self.fragments[msg.auto_rerun.fragment_id] = msg.auto_rerun.interval
+            elif kind == "stop_auto_rerun":
+                self.fragments.clear()
+            elif kind == "script_finished" and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                if self._finished is not None and not self._finished.done():
+                    self._finished.set_result(msg.script_finished)
+
+    def _on_element(self, element):
+        element_type = element.WhichOneof("type")
+        if element_type == "exception":
+            self.stats.exception(f"{element.exception.type}: {element.exception.message}")
+        elif element_type == "checkbox" and element.checkbox.label == AUTO_REFRESH_LABEL and self.auto_refresh:
+            if self.widget_states is None:
+                self.widget_states = BackMsg().rerun_script.widget_states
+                widget = self.widget_states.widgets.add()
+                widget.id = element.checkbox.id
+                widget.bool_value = True
+
+
+class StageStats:
+    """Rerun latencies, start lag and missed refresh ticks per rerun kind for one stage"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.lags = {}
+        self.missed_ticks = {}
+        self.exceptions = Counter()
+        self.recording = False
+
+    def rerun(self, name, seconds):
+        if self.recording:
+            self.latencies.setdefault(name, []).append(seconds * 1000)
+
+    def lag(self, name, seconds):
+        if self.recording:
+            self.lags.setdefault(name, []).append(seconds * 1000)
+
+    def exception(self, message):
+        if self.recording:
+            self.exceptions[message] += 1
+
+    def missed(self, name):
+        if self.recording:
+            self.missed_ticks[name] = self.missed_ticks.get(name, 0) + 1
+
+    def summary(self, duration):
+        reruns = {}
+        for name, values in sorted(self.latencies.items()):
+            lags = self.lags.get(name, [])
+            reruns[name] = {
+                "count": len(values),
+                "per_second": round(len(values) / duration, 2),
+                "p50_ms": round(float(np.percentile(values, 50)), 1),
+                "p95_ms": round(float(np.percentile(values, 95)), 1),
+                "p99_ms": round(float(np.percentile(values, 99)), 1),
+                "max_ms": round(max(values), 1),
+                "lag_p95_ms": round(float(np.percentile(lags, 95)), 1) if lags else None,
+                "missed_ticks": self.missed_ticks.get(name, 0),
+            }
+        return reruns
+
+
+# ========================================
+# LOAD TEST
+# ========================================
+
+async def run_stage(n, url, mock, sampler, args):
+    stats = StageStats()
+    stop = asyncio.Event()
+    writer_stop = asyncio.Event()
+    writer = asyncio.create_task(alert_writer(mock.store, args.alert_interval, writer_stop))
+
+    sessions = [Session(url, stats, not args.no_auto_refresh) for _ in range(n)]
+    tasks = []
+    for session in sessions:
+        tasks.append(asyncio.create_task(session.run(stop)))
+        await asyncio.sleep(args.ramp / max(n, 1))  # Stagger connects like tabs opening over a few seconds
+    await asyncio.sleep(args.warmup)
+
+    stats.recording = True
+    requests_before, cpu_before = mock.total_requests(), sampler.cpu_seconds()
+    start = time.monotonic()
+    rss_peak = 0.0
+    while time.monotonic() - start < args.duration:
+        rss_peak = max(rss_peak, sampler.rss_mb())
+        failed = [task for task in tasks if task.done() and task.exception()]
+        if failed:
+            raise failed[0].exception()
+        await asyncio.sleep(0.5)
+    elapsed = time.monotonic() - start
+    stats.recording = False
+
+    result = {
+        "sessions": n,
+        "backend_requests_per_second": round((mock.total_requests() - requests_before) / elapsed, 2),
+        "server_cpu_percent": round((sampler.cpu_seconds() - cpu_before) / elapsed * 100, 1),
+        "server_rss_mb": round(sampler.rss_mb(), 1),
+        "server_rss_peak_mb": round(rss_peak, 1),
+        "exceptions": dict(stats.exceptions),
+        "reruns": stats.summary(elapsed),
+    }
+
+    stop.set()
+    writer_stop.set()
+    await asyncio.gather(*tasks, writer, return_exceptions=True)
+    return result
+
+
+def print_stage(result):
+    print(f"\n👥 {result['sessions']} sessions: backend {result['backend_requests_per_second']} req/s, "
+          f"server CPU {result['server_cpu_percent']}%, RSS {result['server_rss_mb']} MB "
+          f"(peak {result['server_rss_peak_mb']} MB)")
+    print(f"   {'rerun':<22}{'per s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'lag p95':>9}{'missed':>8}")
+    for name, rerun in result["reruns"].items():
+        lag = f"{rerun['lag_p95_ms']:>9.1f}" if rerun["lag_p95_ms"] is not None else f"{'-':>9}"
+        print(f"   {name:<22}{rerun['per_second']:>8.2f}{rerun['p50_ms']:>9.1f}{rerun['p95_ms']:>9.1f}"
+              f"{rerun['p99_ms']:>9.1f}{rerun['max_ms']:>9.1f}{lag}{rerun['missed_ticks']:>8}")
+    for message, count in result["exceptions"].items():
+        print(f"   ❌ {count}x {message}")
+
+
+async def run_load_test(args):
+    workdir = Path(tempfile.mkdtemp(prefix="tt_stats_load_"))
+    mock = MockPostgrestServer(data_dir=args.data_dir, faults=faults_from_args(args)).start()
+    port = args.port or free_port()
+    process = start_dashboard(workdir, mock.url, port, args.phase)
+    print(f"🧪 Mock PostgREST at {mock.url}, dashboard at http://127.0.0.1:{port} (logs in {workdir})")
+    print(f"🕒 Refresh schedule pinned to the {args.phase} market phase")
+
+    results = []
+    try:
+        sampler = ProcessSampler(process.pid)
+        url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        for n in args.sessions:
+            result = await run_stage(n, url, mock, sampler, args)
+            print_stage(result)
+            results.append(result)
+            await asyncio.sleep(args.cooldown)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        mock.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,5,10,25", help="comma-separated session counts, one stage each")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds per stage")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds after the last session connects before measuring")
+    parser.add_argument("--ramp", type=float, default=3, help="seconds over which a stage's sessions connect")
+    parser.add_argument("--cooldown", type=float, default=2, help="seconds between stages")
+    parser.add_argument("--alert-interval", type=float, default=1, help="seconds between synthetic alert writes per symbol")
+    parser.add_argument("--no-auto-refresh", action="store_true", help="leave section auto-refresh off (alerts only)")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="seed data for the mock, e.g. a benchmark.py --workdir data/")
+    parser.add_argument("--port", type=int, default=0, help="dashboard port (default: any free port)")
+    parser.add_argument("--phase", default="rth", choices=MARKET_PHASES, help="market phase whose refresh schedule the dashboard uses")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    args.sessions = [int(n) for n in args.sessions.split(",")]
+
+    results = asyncio.run(run_load_test(args))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "generated_at": datetime.now(pytz.utc).isoformat(),
+            "config": {key: value for key, value in vars(args).items() if key != "output"},
+            "stages": results,
+        }, indent=2))
+        print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Local PostgREST stand-in for the dashboard's Supabase tables
+Serves the subset of the REST API the dashboard and scripts use, from memory, seeded from data/*.json:
+
+    GET  /rest/v1/<table>?select=data,updated_at&id=eq.1   (.select().eq().single(), .gt(), .order(), .limit())
+    POST /rest/v1/<table>                                   (.insert() / .upsert())
+    POST /rest/v1/rpc/dashboard_snapshot                    (bulk poll, see docs/SUPABASE_SETUP.md)
+
+Latency, jitter, error responses and hung requests can be injected, from the command line
+or at runtime through GET/POST /mock/config (request counts at GET /mock/stats):
+
+    python scripts/mock_postgrest.py --port 54321 --latency-ms 80 --jitter-ms 40 --failure-rate 0.05 --seed 1
+    curl -X POST localhost:54321/mock/config -d '{"failure_rate": 1.0}'    # simulate an outage
+
+Point the dashboard or any scripts/test_*.py at it with environment variables
+(realtime isn't mocked, so turn the change feed off):
+
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=mock CHANGE_FEED=off streamlit run streamlit_app.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# The 11 single-row tables and the data/ file each one is seeded from
+TABLE_FILES = {
+    "alerts_nq": "alerts_nq.json",
+    "alerts_es": "alerts_es.json",
+    "gap_details": "gap_details.json",
+    "ib_details": "ib_details.json",
+    "single_prints": "single_prints.json",
+    "market_environment": "market_environment.json",
+    "risk_assessment": "risk_assessment.json",
+    "daily_context": "daily_context.json",
+    "opening_range": "opening_range.json",
+    "stage_progression": "stage_progression.json",
+    "tpo_profile": "tpo_profile.json",
+}
+ALERT_EVENTS_TABLE = "alert_events"
+SNAPSHOT_RPC = "dashboard_snapshot"
+
+SINGLE_OBJECT = "application/vnd.pgrst.object+json"
+MOCK_PREFIX = "/mock/"  # Control endpoints, not part of PostgREST
+
+FILTERS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def now_stamp():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class PostgrestError(Exception):
+    """An error response in PostgREST's {code, message, details, hint} shape"""
+
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class FaultConfig:
+    """Latency, jitter and failures added to requests, seeded so runs are repeatable.
+
+    Each request waits latency_ms +/- jitter_ms. Then a failure_rate share of
+    requests get a failure_status error, and a hang_rate share stall for
+    hang_seconds before a 504, the way an overloaded project looks from the
+    client. With `tables` set, only those paths (e.g. "gap_details",
+    "rpc/dashboard_snapshot") are affected.
+
+    supabase-py retries reads answered with 503 or 520 with backoff, so the
+    default failure_status is 500, which reaches the caller as an APIError.
+    """
+
+    FIELDS = ("latency_ms", "jitter_ms", "failure_rate", "failure_status", "hang_rate", "hang_seconds", "tables")
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, failure_rate=0.0, failure_status=500,
+                 hang_rate=0.0, hang_seconds=30.0, tables=None, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.tables = tables
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def update(self, changes):
+        unknown = set(changes) - set(self.FIELDS) - {"seed"}
+        if unknown:
+            raise ValueError(f"Unknown fault settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            for field in self.FIELDS:
+                if field in changes:
+                    setattr(self, field, changes[field])
+            if "seed" in changes:
+                self._random.seed(changes["seed"])
+
+    def apply(self, target):
+        """Sleep for this request's latency; raise PostgrestError if it was picked to fail"""
+        if self.tables and target not in self.tables:
+            return
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            draw = self._random.random()
+        if delay:
+            time.sleep(delay)
+        if draw < self.failure_rate:
+            raise PostgrestError(self.failure_status, "PGRST000", "Injected failure (mock_postgrest)")
+        if draw < self.failure_rate + self.hang_rate:
+            time.sleep(self.hang_seconds)
+            raise PostgrestError(504, "PGRST000", "Injected timeout (mock_postgrest)")
+
+
+class MockStore:
+    """In-memory tables: the 11 single-row data tables plus alert_events"""
+
+    def __init__(self, data_dir=DATA_DIR):
+        self._lock = threading.Lock()
+        self._tables = {name: {} for name in TABLE_FILES}
+        self._tables[ALERT_EVENTS_TABLE] = {}
+        self._next_event_id = 1
+        for table_name, file_name in TABLE_FILES.items():
+            file_path = Path(data_dir) / file_name
+            if file_path.exists():
+                self.upsert(table_name, [{"id": 1, "data": json.loads(file_path.read_text())}])
+
+    def select(self, table_name, filters=(), order=None, limit=None, offset=0):
+        with self._lock:
+            rows = list(self._table(table_name).values())
+        for column, op, value in filters:
+            rows = [row for row in rows if row.get(column) is not None and FILTERS[op](row[column], coerce(row[column], value))]
+        if order:
+            column, descending = order
+            rows.sort(key=lambda row: row.get(column), reverse=descending)
+        rows = rows[offset:]
+        return rows[:limit] if limit is not None else rows
+
+    def upsert(self, table_name, rows, merge=True):
+        """Insert rows, replacing ones with the same id when `merge` (Prefer: resolution=merge-duplicates)"""
+        stored = []
+        with self._lock:
+            table = self._table(table_name)
+            for row in rows:
+                row = dict(row)
+                if table_name == ALERT_EVENTS_TABLE:
+                    row.setdefault("id", self._next_event_id)
+                    row.setdefault("created_at", now_stamp())
+                    self._next_event_id = max(self._next_event_id, row["id"]) + 1
+                else:
+                    # Same as the touch_updated_at trigger
+                    row["updated_at"] = now_stamp()
+                if row.get("id") in table:
+                    if not merge:
+                        raise PostgrestError(409, "23505", f'duplicate key value violates unique constraint "{table_name}_pkey"')
+                    row = {**table[row["id"]], **row}
+                table[row.get("id")] = row
+                stored.append(row)
+        return stored
+
+    def snapshot(self, tables, known_versions):
+        """dashboard_snapshot(): {table: {data, updated_at}}, without data where the version matches"""
+        result = {}
+        for table_name in tables:
+            if table_name not in TABLE_FILES:
+                continue
+            rows = self.select(table_name, [("id", "eq", "1")])
+            if not rows:
+                result[table_name] = None
+            elif known_versions.get(table_name) == rows[0]["updated_at"]:
+                result[table_name] = {"updated_at": rows[0]["updated_at"]}
+            else:
+                result[table_name] = {"data": rows[0]["data"], "updated_at": rows[0]["updated_at"]}
+        return result
+
+    def _table(self, table_name):
+        if table_name not in self._tables:
+            raise PostgrestError(404, "42P01", f'relation "public.{table_name}" does not exist')
+        return self._tables[table_name]
+
+
+def coerce(current, value):
+    """Cast a filter value from the query string to the column's type"""
+    if isinstance(current, bool):
+        return value == "true"
+    if isinstance(current, int):
+        return int(value)
+    if isinstance(current, float):
+        return float(value)
+    return value
+
+
+def project(row, select):
+    if not select or select == "*":
+        return row
+    return {column.strip(): row.get(column.strip()) for column in select.split(",")}
+
+
+class PostgrestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._handle(self._get)
+
+    def do_HEAD(self):
+        self._handle(self._get)
+
+    def do_POST(self):
+        self._handle(self._post)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would drown out the load test's own output
+
+    def _handle(self, method):
+        path = urlsplit(self.path).path
+        if path.startswith(MOCK_PREFIX):
+            return self._handle_control(path[len(MOCK_PREFIX):])
+
+        self.server.count_request(path)
+        try:
+            if not path.startswith("/rest/v1/"):
+                raise PostgrestError(404, "PGRST000", f"No route for {path}")
+            target = path[len("/rest/v1/"):]
+            self.server.faults.apply(target)
+            status, body = method(target)
+        except PostgrestError as e:
+            status, body = e.status, {"code": e.code, "message": str(e), "details": None, "hint": None}
+        except (ValueError, KeyError) as e:
+            status, body = 400, {"code": "PGRST100", "message": f"Bad request: {e}", "details": None, "hint": None}
+        self._respond(status, body)
+
+    def _handle_control(self, name):
+        """/mock/config (GET to read, POST JSON to change fault settings) and /mock/stats"""
+        try:
+            if name == "config":
+                if self.command == "POST":
+                    length = int(self.headers.get("Content-Length") or 0)
+                    self.server.faults.update(json.loads(self.rfile.read(length) or b"{}"))
+                self._respond(200, self.server.faults.to_dict())
+            elif name == "stats":
+                self._respond(200, {"total": self.server.total_requests(), "by_path": dict(self.server.requests)})
+            else:
+                self._respond(404, {"message": f"No mock control endpoint {name}"})
+        except ValueError as e:
+            self._respond(400, {"message": str(e)})
+
+    def _get(self, table_name):
+        params = parse_qsl(urlsplit(self.path).query)
+        select, filters, order, limit, offset = "*", [], None, None, 0
+        for key, value in params:
+            if key == "select":
+                select = value
+            elif key == "order":
+                column, _, direction = value.partition(".")
+                order = (column, direction.startswith("desc"))
+            elif key == "limit":
+                limit = int(value)
+            elif key == "offset":
+                offset = int(value)
+            else:
+                op, _, operand = value.partition(".")
+                if op not in FILTERS:
+                    raise PostgrestError(400, "PGRST100", f"Unsupported operator: {op}")
+                filters.append((key, op, operand))
+
+        rows = [project(row, select) for row in self.server.store.select(table_name, filters, order, limit, offset)]
+        return self._result(rows)
+
+    def _post(self, path):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"null")
+
+        if path.startswith("rpc/"):
+            if path != f"rpc/{SNAPSHOT_RPC}":
+                raise PostgrestError(404, "PGRST202", f"Could not find the function public.{path[4:]} in the schema cache")
+            return 200, self.server.store.snapshot(payload.get("tables", []), payload.get("known_versions") or {})
+
+        merge = "resolution=merge-duplicates" in (self.headers.get("Prefer") or "")
+        rows = self.server.store.upsert(path, payload if isinstance(payload, list) else [payload], merge=merge)
+        if "return=minimal" in (self.headers.get("Prefer") or ""):
+            return 201, None
+        return 201, rows
+
+    def _result(self, rows):
+        if SINGLE_OBJECT in (self.headers.get("Accept") or ""):
+            if len(rows) != 1:
+                raise PostgrestError(406, "PGRST116", f"JSON object requested, multiple (or no) rows returned ({len(rows)})")
+            return 200, rows[0]
+        return 200, rows
+
+    def _respond(self, status, body):
+        encoded = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(encoded)
+
+
+class MockPostgrestServer(ThreadingHTTPServer):
+    """Threaded HTTP server around a MockStore that counts requests per path"""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, data_dir=DATA_DIR, faults=None):
+        super().__init__((host, port), PostgrestHandler)
+        self.store = MockStore(data_dir)
+        self.faults = faults or FaultConfig()
+        self.requests = Counter()
+        self._count_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self, path):
+        with self._count_lock:
+            self.requests[path] += 1
+
+    def total_requests(self):
+        with self._count_lock:
+            return sum(self.requests.values())
+
+    def start(self):
+        """Serve from a daemon thread; returns self so it chains after the constructor"""
+        threading.Thread(target=self.serve_forever, name="mock-postgrest", daemon=True).start()
+        return self
+
+
+def add_fault_arguments(parser):
+    """FaultConfig options, shared with scripts that start the mock themselves"""
+    parser.add_argument("--latency-ms", type=float, default=0, help="added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="latency varies by up to +/- this much")
+    parser.add_argument("--failure-rate", type=float, default=0, help="share of requests answered with --failure-status")
+    parser.add_argument("--failure-status", type=int, default=500,
+                        help="503/520 are retried by supabase-py for reads, so they mostly show up as latency")
+    parser.add_argument("--hang-rate", type=float, default=0, help="share of requests that stall for --hang-seconds, then 504")
+    parser.add_argument("--hang-seconds", type=float, default=30)
+    parser.add_argument("--fault-tables", help="comma-separated tables (or rpc/<name>) to inject into; default all")
+    parser.add_argument("--seed", type=int, help="seed for jitter and failure draws")
+
+
+def faults_from_args(args):
+    return FaultConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate, failure_status=args.failure_status,
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds,
+        tables=args.fault_tables.split(",") if args.fault_tables else None, seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="directory of <table>.json seed files")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockPostgrestServer(args.host, args.port, args.data_dir, faults_from_args(args))
+    print(f"🧪 Mock PostgREST serving {len(TABLE_FILES)} tables at {server.url}")
+    print(f"   Faults: {server.faults.to_dict()}")
+    print(f"   SUPABASE_URL={server.url} SUPABASE_KEY=mock CHANGE_FEED=off streamlit run streamlit_app.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Supabase client for the test scripts in this folder
+
+Reads SUPABASE_URL / SUPABASE_KEY from the environment, then from
+.streamlit/secrets.toml, the same way the dashboard does. There is no
+built-in project: point them at your own project or at mock_postgrest.py
+(see README_TESTING.md).
+"""
+
+import os
+import sys
+import tomllib
+from pathlib import Path
+
+from supabase import create_client, Client
+
+SECRETS_FILE = Path(__file__).resolve().parent.parent / ".streamlit" / "secrets.toml"
+MOCK_URL = "http://127.0.0.1:54321"
+
+
+def supabase_setting(name):
+    value = os.environ.get(name)
+    if value:
+        return value
+    if SECRETS_FILE.exists():
+        with open(SECRETS_FILE, "rb") as f:
+            return tomllib.load(f).get(name)
+    return None
+
+
+def connect() -> Client:
+    """Client for the configured project, or exit with how to configure one"""
+    url = supabase_setting("SUPABASE_URL")
+    key = supabase_setting("SUPABASE_KEY")
+    if not url or not key:
+        sys.exit(
+            "❌ SUPABASE_URL and SUPABASE_KEY are not set.\n"
+            f"   Set them in the environment or in {SECRETS_FILE}, or run against the local mock:\n"
+            "     python scripts/mock_postgrest.py &\n"
+            f"     SUPABASE_URL={MOCK_URL} SUPABASE_KEY=mock python {sys.argv[0]}"
+        )
+    return create_client(url, key)
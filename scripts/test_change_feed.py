@@ -0,0 +1,73 @@
+"""
+Offline test for the push-based change feed
+Drives the dashboard's poller with the local stand-in publisher instead of Supabase realtime
+"""
+
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from time import sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from streamlit_app import DataPoller, LocalChangePublisher, ChangeFeedSubscriber, TABLE_REFRESH_SECONDS
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+class LocalJsonClient:
+    """Answers the poller's table(...).select(...).eq('id', 1).single().execute() from data/*.json"""
+
+    def __init__(self):
+        self.requests = 0
+
+    def table(self, table_name):
+        self._table_name = table_name
+        return self
+
+    def select(self, *columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def single(self):
+        return self
+
+    def execute(self):
+        self.requests += 1
+        file_path = DATA_DIR / f"{self._table_name}.json"
+        data = json.loads(file_path.read_text()) if file_path.exists() else []
+        updated_at = datetime.fromtimestamp(file_path.stat().st_mtime, timezone.utc).isoformat() if file_path.exists() else None
+        return type("Response", (), {"data": {"data": data, "updated_at": updated_at}})()
+
+
+client = LocalJsonClient()
+poller = DataPoller(client, TABLE_REFRESH_SECONDS)
+publisher = LocalChangePublisher()
+invalidated = []
+
+feed = ChangeFeedSubscriber(poller, publisher, TABLE_REFRESH_SECONDS, invalidated.append)
+
+# Let the catch-up poll run, then confirm the poller goes quiet while the feed is connected
+sleep(1)
+requests_before = client.requests
+sleep(2)
+print(f"✅ Feed connected: {feed.connected}")
+print(f"📉 Supabase requests while idle: {client.requests - requests_before}")
+
+# Push a new alert through the stand-in publisher
+new_alert = {
+    "timestamp": "2025-10-25T15:00:00",
+    "symbol": "NQ",
+    "type": "TEST - Change Feed",
+    "priority": "critical",
+    "message": "Delivered by the local change publisher",
+    "price": 20950.00
+}
+publisher.publish("alerts_nq", [new_alert], datetime.now(timezone.utc).isoformat())
+
+snapshot = poller.get("alerts_nq")
+print(f"✅ alerts_nq snapshot replaced: {snapshot.data[0]['type']} (version {snapshot.version})")
+print(f"🧹 Section caches invalidated: {invalidated}")
@@ -1,13 +1,27 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, time, timedelta
 import json
+import os
 from pathlib import Path
 import pytz
 import base64
+import asyncio
+import threading
+import heapq
+import functools
+import logging
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from itertools import count as version_counter
+from time import monotonic, perf_counter, sleep
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
 
 # Page config
 st.set_page_config(
@@ -17,32 +31,201 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def supabase_setting(name, default=None):
+    """A Supabase setting from the environment, falling back to secrets.
+
+    Environment variables win so a run can be pointed at another project or at
+    scripts/mock_postgrest.py without editing secrets.toml.
+    """
+    value = os.environ.get(name)
+    if value is not None:
+        return value
+    try:
+        return st.secrets.get(name, default)
+    except Exception:  # No secrets file at all
+        return default
+
+SUPABASE_TIMEOUT_SECONDS = 5  # Probes and updated_at checks; supabase-py's default is 120
+SUPABASE_FETCH_TIMEOUT_SECONDS = 30  # Data downloads, which can be large on a cold start
+
 # Initialize Supabase client
 @st.cache_resource
-def init_supabase():
-    """Initialize Supabase client with credentials from secrets"""
+def init_supabase(timeout=SUPABASE_TIMEOUT_SECONDS):
+    """Initialize Supabase client with credentials from the environment or secrets.
+
+    Problems are logged rather than shown with st.warning, as the first call
+    may come from a background refresh with no script run to draw into
+    (render_backend_status tells the user).
+    """
     try:
-        from supabase import create_client, Client
+        from supabase import create_client, Client, ClientOptions
 
-        # Check if secrets exist
-        if "SUPABASE_URL" not in st.secrets or "SUPABASE_KEY" not in st.secrets:
-            st.warning("⚠️ Supabase credentials not configured. Using local JSON files.")
-            return None
+        url = supabase_setting("SUPABASE_URL")
+        key = supabase_setting("SUPABASE_KEY")
 
-        url = st.secrets["SUPABASE_URL"]
-        key = st.secrets["SUPABASE_KEY"]
+        # Check if credentials exist
+        if url is None or key is None:
+            logger.warning("Supabase credentials not configured. Using local JSON files.")
+            return None
 
         if not url or not key:
-            st.warning("⚠️ Supabase credentials are empty. Using local JSON files.")
+            logger.warning("Supabase credentials are empty. Using local JSON files.")
             return None
 
-        return create_client(url, key)
+        # Fail fast so a dead backend trips the circuit breaker instead of stalling every poll
+        return create_client(url, key, options=ClientOptions(postgrest_client_timeout=timeout))
     except Exception as e:
-        st.error(f"❌ Failed to connect to Supabase: {e}")
+        logger.error("Failed to connect to Supabase: %s", e)
         return None
 
 supabase = init_supabase()
 
+# ========================================
+# ALERT WINDOW
+# ========================================
+
+# Only alerts from the last 2 hours are shown, at most 20 per symbol (see ALERTS_FORMAT.md).
+# Per-session alert state (dismissed, seen and toasted IDs) is evicted once it falls out
+# of the same window.
+ALERT_WINDOW = pd.Timedelta(hours=2)
+ALERT_WINDOW_MAX_ALERTS = 20
+ALERT_SYMBOLS = ('NQ', 'ES')
+ALERT_PANEL_REFRESH_SECONDS = 1  # The sidebar alert panel reruns on its own at this cadence
+ALERT_TZ = pytz.timezone('US/Eastern')
+
+def alert_wall_time(timestamps):
+    """Alert timestamps as naive US/Eastern wall time, whatever timezone they were parsed with"""
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert(ALERT_TZ).dt.tz_localize(None)
+    return timestamps
+
+def alert_window_start():
+    """Oldest alert time (US/Eastern) still inside the visible window"""
+    return pd.Timestamp.now(tz=ALERT_TZ) - ALERT_WINDOW
+
+def sort_alerts(df):
+    """Alerts oldest first (the order the window search relies on), applied once at ingest"""
+    if df['timestamp'].is_monotonic_increasing:
+        return df
+    return df.dropna(subset=['timestamp']).sort_values('timestamp', kind='stable', ignore_index=True)
+
+def alert_wall_timestamp(value):
+    """One alert timestamp as naive US/Eastern wall time, or NaT if it doesn't parse"""
+    timestamp = pd.to_datetime(value, errors='coerce')
+    if timestamp is not pd.NaT and timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(ALERT_TZ).tz_localize(None)
+    return timestamp
+
+def alerts_from_records(records):
+    """Typed alert frame from raw alert records, sorted oldest first.
+
+    Records that aren't objects or whose timestamp is missing or unparseable
+    are dropped, so one bad alert can't stop the rest of a batch from loading.
+    Timestamps are stored as naive US/Eastern wall time, so frames built from
+    writers with and without an offset can be merged. Returns None if nothing
+    usable is left.
+    """
+    df = pd.DataFrame([record for record in records if isinstance(record, dict)])
+    if 'timestamp' not in df.columns:
+        return None
+    try:
+        timestamps = pd.to_datetime(df['timestamp'])
+    except (TypeError, ValueError):
+        timestamps = None
+    if timestamps is not None and pd.api.types.is_datetime64_any_dtype(timestamps):
+        df['timestamp'] = alert_wall_time(timestamps)
+    else:
+        # Bad values or mixed offsets - parse one by one so only the bad values become NaT
+        df['timestamp'] = pd.to_datetime(df['timestamp'].map(alert_wall_timestamp), errors='coerce')
+    df = df.dropna(subset=['timestamp'])
+    if df.empty:
+        return None
+    return sort_alerts(apply_schema(df.reset_index(drop=True), ALERT_SCHEMA))
+
+def append_alerts(df, new_rows):
+    """Merge sorted new alerts into a sorted frame, re-sorting only if they arrived out of order"""
+    if df is None:
+        return new_rows
+    merged = apply_schema(pd.concat([df, new_rows], ignore_index=True), ALERT_SCHEMA)  # Re-type categories that differed
+    if new_rows['timestamp'].iloc[0] >= df['timestamp'].iloc[-1]:
+        return merged
+    return sort_alerts(merged)
+
+def alert_window(df, symbol, dismissed=None):
+    """The alerts to show for a symbol: newest first, with their alert_id column.
+
+    df must be oldest first (see sort_alerts). The start of the window is found
+    by binary search on the timestamp column and the slice is capped at
+    ALERT_WINDOW_MAX_ALERTS, so everything downstream - IDs, counts, rendering -
+    costs the same however much history has been loaded. Alerts in `dismissed`
+    (an AlertIdWindow) are dropped before the cap, so dismissing one lets the
+    next older alert in the window take its place.
+    """
+    timestamps = df['timestamp']
+    start = alert_window_start()
+    start = start.tz_convert(timestamps.dt.tz) if timestamps.dt.tz is not None else start.tz_localize(None)
+    # Widen the slice by the dismissed count so the cap still has enough alerts to fill it
+    max_rows = ALERT_WINDOW_MAX_ALERTS + (len(dismissed) if dismissed is not None else 0)
+    first = max(timestamps.searchsorted(start), len(df) - max_rows)
+
+    window = df.iloc[first:].iloc[::-1].reset_index(drop=True)
+    window['alert_id'] = generate_alert_ids(window, symbol)
+    if dismissed is not None and len(dismissed):
+        window = window[~dismissed.isin(window['alert_id'])].reset_index(drop=True)
+    return window.head(ALERT_WINDOW_MAX_ALERTS)
+
+class AlertIdWindow:
+    """Set of alert IDs that forgets alerts once they age out of ALERT_WINDOW.
+
+    Holds the compact integer alert IDs with each alert's timestamp, plus a
+    min-heap on timestamp so eviction only ever looks at the oldest entries.
+    IDs are only ever taken from alert_window frames and are kept exactly as
+    long as their alert can still be shown, so a dismissed alert can't come
+    back. There is no count cap: the set never holds more than the alerts
+    inside ALERT_WINDOW, and memory stays flat however long a session is open.
+    """
+
+    def __init__(self):
+        self._ids = {}  # alert_id -> alert timestamp (ns, naive US/Eastern)
+        self._heap = []  # (timestamp, alert_id), oldest first
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, alert_id):
+        return alert_id in self._ids
+
+    def isin(self, alert_ids):
+        """Boolean mask of which alert_ids (a Series) are in the set"""
+        self._evict()
+        return alert_ids.isin(np.fromiter(self._ids, dtype=np.uint64, count=len(self._ids)))
+
+    def add(self, alert_id, timestamp):
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert(ALERT_TZ).tz_localize(None)
+        self._insert(alert_id, timestamp.as_unit('ns').value)
+        self._evict()
+
+    def update(self, alerts):
+        """Add every alert in a frame with alert_id and timestamp columns"""
+        timestamps = alert_wall_time(alerts['timestamp']).dt.as_unit('ns').astype('int64')
+        for alert_id, timestamp in zip(alerts['alert_id'].tolist(), timestamps.tolist()):
+            self._insert(alert_id, timestamp)
+        self._evict()
+
+    def _insert(self, alert_id, timestamp):
+        if alert_id in self._ids:
+            return
+        self._ids[alert_id] = timestamp
+        heapq.heappush(self._heap, (timestamp, alert_id))
+
+    def _evict(self):
+        cutoff = alert_window_start().tz_localize(None).as_unit('ns').value
+        while self._heap and self._heap[0][0] < cutoff:
+            timestamp, alert_id = heapq.heappop(self._heap)
+            del self._ids[alert_id]
+
 # Initialize session state for section ordering
 # Force reset section order to remove "Alerts" if it exists from old sessions
 if 'section_order' not in st.session_state or 'Alerts' in st.session_state.section_order:
@@ -60,7 +243,7 @@ if 'section_order' not in st.session_state or 'Alerts' in st.session_state.secti
 
 # Initialize session state for dismissed alerts (user-specific, doesn't affect others)
 if 'dismissed_alerts' not in st.session_state:
-    st.session_state.dismissed_alerts = set()
+    st.session_state.dismissed_alerts = AlertIdWindow()
 
 # Initialize session state for expanded alerts view
 if 'expanded_nq_alerts' not in st.session_state:
@@ -73,11 +256,15 @@ if 'sound_enabled' not in st.session_state:
     st.session_state.sound_enabled = True
 
 if 'seen_alerts' not in st.session_state:
-    st.session_state.seen_alerts = set()
+    st.session_state.seen_alerts = AlertIdWindow()
 
 # Initialize session state for toast notifications
 if 'toast_alerts' not in st.session_state:
-    st.session_state.toast_alerts = set()
+    st.session_state.toast_alerts = AlertIdWindow()
+
+# Initialize session state for per-section timings (shown in the opt-in sidebar panel)
+if 'section_metrics' not in st.session_state:
+    st.session_state.section_metrics = {}
 
 # Initialize session state for custom sound uploads
 if 'custom_sounds' not in st.session_state:
@@ -112,6 +299,15 @@ st.markdown("""
         font-weight: bold;
         animation: blink 2s infinite;
     }
+    .stale-badge {
+        font-size: 0.8rem;
+        padding: 0.15rem 0.5rem;
+        border-radius: 0.3rem;
+        font-weight: bold;
+        background-color: #ffc107;
+        color: black;
+        display: inline-block;
+    }
     @keyframes blink {
         0%, 100% { opacity: 1; }
         50% { opacity: 0.5; }
@@ -217,283 +413,1880 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# ========================================
+# BACKEND HEALTH (CIRCUIT BREAKER)
+# ========================================
+
+BACKEND_FAILURE_THRESHOLD = 3  # Consecutive failed requests before the circuit opens
+BACKEND_BACKOFF_SECONDS = 2.0  # First wait before probing; doubles after every failed probe
+BACKEND_BACKOFF_MAX_SECONDS = 60.0
+BACKEND_PROBE_TABLE = 'gap_details'  # Single-row table that exists in every storage mode
+
+class BackendUnavailable(Exception):
+    """Raised instead of calling Supabase while the circuit is open"""
+
+def is_backend_failure(error):
+    """True if an error means Supabase is down or broken, not that the request was wrong.
+
+    PostgREST request/schema errors (PGRST1xx, PGRST2xx) and Postgres data,
+    constraint and syntax errors (classes 22, 23, 42) come back from a healthy
+    backend, so they don't count towards opening the circuit.
+    """
+    code = getattr(error, 'code', None)
+    if isinstance(code, str) and code.startswith(('PGRST1', 'PGRST2', '22', '23', '42')):
+        return False
+    return True
+
+class BackendHealth:
+    """Circuit breaker shared by every session talking to Supabase.
+
+    closed: requests go through as normal. After BACKEND_FAILURE_THRESHOLD
+    failures in a row the circuit opens: the poller stops polling and loaders
+    go straight to their local JSON files, so nobody waits on a dead backend.
+    Once the backoff has passed, the poller sends a single cheap probe; success
+    closes the circuit, failure keeps it open with double the backoff (capped
+    at BACKEND_BACKOFF_MAX_SECONDS).
+    """
+
+    def __init__(self, threshold=BACKEND_FAILURE_THRESHOLD, backoff=BACKEND_BACKOFF_SECONDS,
+                 max_backoff=BACKEND_BACKOFF_MAX_SECONDS):
+        self._threshold = threshold
+        self._base_backoff = backoff
+        self._max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0
+        self.backoff = 0.0
+        self.retry_at = 0.0
+        self.last_error = None
+
+    def available(self):
+        return self.state == 'closed'
+
+    def probe_due(self):
+        return self.state == 'open' and monotonic() >= self.retry_at
+
+    def retry_in(self):
+        """Seconds until the next recovery probe (0 when closed or already due)"""
+        return max(0.0, self.retry_at - monotonic()) if self.state == 'open' else 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.backoff = 0.0
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            if self.state == 'closed':
+                if self.failures < self._threshold:
+                    return
+                self.backoff = self._base_backoff
+            elif monotonic() >= self.retry_at:
+                # The recovery probe failed - back off further
+                self.backoff = min(self.backoff * 2, self._max_backoff)
+            else:
+                # A request that was already in flight when the circuit opened
+                return
+            self.state = 'open'
+            self.retry_at = monotonic() + self.backoff
+
+@st.cache_resource
+def get_backend_health():
+    """One circuit breaker per server process"""
+    return BackendHealth()
+
+def backend_available():
+    """False while the circuit is open and loaders should skip Supabase"""
+    return get_backend_health().available()
+
+def render_backend_status():
+    """Warn while Supabase is unreachable and sections are served from local files"""
+    if not supabase:
+        st.warning("⚠️ Supabase not configured. Using local JSON files.")
+        return
+    health = get_backend_health()
+    if not health.available():
+        st.warning(f"⚠️ Supabase unreachable - showing local data. Retrying in {health.retry_in():.0f}s")
+
+# ========================================
+# MARKET CLOCK (REFRESH SCHEDULE)
+# ========================================
+
+MARKET_TZ = pytz.timezone('US/Eastern')
+PREMARKET_START = time(4, 0)
+RTH_OPEN = time(9, 30)
+OPENING_RANGE_END = time(10, 0)
+INITIAL_BALANCE_END = time(10, 30)
+RTH_CLOSE = time(16, 0)
+PHASE_BOUNDARIES = (PREMARKET_START, RTH_OPEN, OPENING_RANGE_END, INITIAL_BALANCE_END, RTH_CLOSE)
+
+# Full-day NYSE closures (early closes still count as a normal session) - extend each year
+MARKET_HOLIDAYS = frozenset(datetime.strptime(day, '%Y-%m-%d').date() for day in (
+    '2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25', '2026-06-19',
+    '2026-07-03', '2026-09-07', '2026-11-26', '2026-12-25',
+    '2027-01-01', '2027-01-18', '2027-02-15', '2027-03-26', '2027-05-31', '2027-06-18',
+    '2027-07-05', '2027-09-06', '2027-11-25', '2027-12-24',
+))
+MARKET_HOLIDAY_YEARS = frozenset(day.year for day in MARKET_HOLIDAYS)
+
+MARKET_PHASES = ('premarket', 'opening_range', 'initial_balance', 'rth', 'closed')
+MARKET_PHASE_LABELS = {
+    'premarket': 'Pre-Market',
+    'opening_range': 'Opening Range',
+    'initial_balance': 'Initial Balance',
+    'rth': 'Regular Hours',
+    'closed': 'Closed',
+}
+SESSION_PHASES = ('opening_range', 'initial_balance', 'rth')
+# Pin the refresh schedule to one phase whatever the clock says (load tests and benchmarks)
+MARKET_PHASE_OVERRIDE = supabase_setting("MARKET_PHASE")
+
+# Refresh cadence in seconds per table for each phase, in MARKET_PHASES order.
+# An hour stands in for "static": the data can't change, so poll next to never.
+REFRESH_SCHEDULE = {
+    #                     premarket   OR    IB   RTH  closed
+    'alerts_nq':          (5,          1,    1,    1,   60),
+    'alerts_es':          (5,          1,    1,    1,   60),
+    'alert_events':       (5,          1,    1,    1,   60),
+    'gap_details':        (30,         5,    5,    5, 3600),  # Gap forms pre-market, fills during RTH
+    'ib_details':         (300,        5,    5,    5, 3600),
+    'single_prints':      (300,        5,    5,    5, 3600),
+    'market_environment': (60,        30,   30,   30, 3600),
+    'risk_assessment':    (120,       60,   60,   60, 3600),
+    'daily_context':      (60,      3600, 3600, 3600, 3600),  # Static after 6 AM generation
+    'opening_range':      (300,        5, 3600, 3600, 3600),  # Updates until 10:00 AM, then static
+    'stage_progression':  (60,         5,    5,    5, 3600),
+    'tpo_profile':        (300,       30,   30,   30, 3600),  # Updates throughout the session
+}
+PHASE_SETTLE_SECONDS = 120  # The previous phase's cadence still applies this long into a new phase, if faster
+
+@st.cache_resource(show_spinner=False)
+def warn_holidays_missing(year):
+    """Log once per server process that MARKET_HOLIDAYS has no dates for a year"""
+    logger.warning("MARKET_HOLIDAYS has no dates for %d - market holidays will be treated as trading days "
+                   "until the list is extended", year)
+
+def market_phase(now=None):
+    """Which part of the trading day it is in New York (weekends and holidays are 'closed')"""
+    if MARKET_PHASE_OVERRIDE in MARKET_PHASES:
+        return MARKET_PHASE_OVERRIDE
+    now = now.astimezone(MARKET_TZ) if now is not None else datetime.now(MARKET_TZ)
+    if now.year not in MARKET_HOLIDAY_YEARS:
+        warn_holidays_missing(now.year)
+    if now.weekday() >= 5 or now.date() in MARKET_HOLIDAYS:
+        return 'closed'
+    clock = now.time()
+    if clock < PREMARKET_START or clock >= RTH_CLOSE:
+        return 'closed'
+    if clock < RTH_OPEN:
+        return 'premarket'
+    if clock < OPENING_RANGE_END:
+        return 'opening_range'
+    if clock < INITIAL_BALANCE_END:
+        return 'initial_balance'
+    return 'rth'
+
+def next_phase_change(now=None):
+    """Seconds until market_phase can next change: the next phase boundary or midnight"""
+    now = now.astimezone(MARKET_TZ) if now is not None else datetime.now(MARKET_TZ)
+    today = now.date()
+    changes = [MARKET_TZ.localize(datetime.combine(today, boundary)) for boundary in PHASE_BOUNDARIES]
+    changes.append(MARKET_TZ.localize(datetime.combine(today + timedelta(days=1), time(0))))
+    return min((change - now).total_seconds() for change in changes if change > now)
+
+class RefreshSchedule:
+    """Refresh cadence per table, picked from the current market phase.
+
+    For the first PHASE_SETTLE_SECONDS of a phase a table keeps the previous
+    phase's cadence if that was faster, so the last writes to data that is
+    going static (the opening range at 10:00, say) are still picked up.
+    """
+
+    def __init__(self, cadences=REFRESH_SCHEDULE, clock=market_phase, next_change=next_phase_change):
+        self._cadences = {table: dict(zip(MARKET_PHASES, seconds)) for table, seconds in cadences.items()}
+        self._clock = clock
+        self._next_change = next_change
+
+    def phase(self, now=None):
+        return self._clock(now)
+
+    def seconds_to_change(self, now=None):
+        """Seconds until the phase may change, so an idle poller can sleep until then"""
+        return self._next_change(now)
+
+    def seconds(self, table_name, now=None):
+        now = now or datetime.now(MARKET_TZ)
+        cadences = self._cadences[table_name]
+        settling = self._clock(now - timedelta(seconds=PHASE_SETTLE_SECONDS))
+        return min(cadences[self._clock(now)], cadences[settling])
+
+refresh_schedule = RefreshSchedule()
+
+def phase_ttl(table_name):
+    """Loader TTL that follows a table's refresh schedule (for @stale_while_revalidate)"""
+    return lambda *args: refresh_schedule.seconds(table_name)
+
+# ========================================
+# SHARED DATA POLLER
+# ========================================
+
+# Fixed poll cadence per Supabase table in seconds, for pollers built without a RefreshSchedule
+TABLE_REFRESH_SECONDS = {
+    'alerts_nq': 1,
+    'alerts_es': 1,
+    'gap_details': 5,
+    'ib_details': 5,
+    'single_prints': 5,
+    'market_environment': 30,
+    'risk_assessment': 60,
+    'daily_context': 300,
+    'opening_range': 5,
+    'stage_progression': 5,
+    'tpo_profile': 30,
+}
+
+STAMP_RECHECK_SECONDS = 120  # Download a table in full this often even when its updated_at hasn't moved
+PUSH_RECHECK_SECONDS = 300  # Safety poll of tables the change feed covers, in case an event was lost
+TABLE_IDLE_SECONDS = 120  # Stop polling a table nobody has read for this long past its cadence
+
+# One table's latest data blob, its version stamp (updated_at) and when it was fetched (monotonic seconds)
+TableSnapshot = namedtuple('TableSnapshot', ['data', 'version', 'fetched_at'])
+
+# Postgres function returning {table: {data, updated_at}} for many tables in one request.
+# Tables whose updated_at matches the caller's known version come back without 'data'.
+SNAPSHOT_RPC = 'dashboard_snapshot'
+
+# Row-per-alert storage (ALERT_STORAGE = "rows" in secrets): one row per alert, increasing id
+ALERT_EVENTS_TABLE = 'alert_events'
+ALERT_EVENTS_PAGE_SIZE = 1000
+ALERT_BUFFER_MAX_ROWS = 5000  # Per symbol, so a server left up for weeks stays bounded
+ALERT_EVENTS_OVERLAP_IDS = 100  # Ids below the cursor re-read each poll, for inserts that commit out of id order
+
+class AlertEventBuffer:
+    """Per-symbol alert history built from cursor-based fetches of alert_events.
+
+    Each refresh asks only for rows with id > last_seen_id and appends them to
+    an in-memory frame per symbol, so the payload of a poll is proportional to
+    the number of new alerts rather than the whole list. Frames are sorted
+    oldest first by timestamp and must be treated as read-only.
+
+    Ids are handed out at insert time but become visible at commit, so a
+    slow transaction can land below the cursor. Each poll therefore re-reads
+    the last ALERT_EVENTS_OVERLAP_IDS ids and skips the ones already merged.
+    Rows without a symbol or a usable timestamp are counted in skipped_rows
+    and dropped; the cursor still moves past them.
+    """
+
+    def __init__(self):
+        self.last_seen_id = 0
+        self.loaded = False
+        self.skipped_rows = 0
+        self._seen_ids = set()
+        self._frames = MappingProxyType({})
+        self._lock = threading.Lock()
+
+    def frame(self, symbol):
+        return self._frames.get(symbol)
+
+    def refresh(self, client):
+        """Fetch and merge every alert newer than the cursor"""
+        with self._lock:
+            if not self.loaded:
+                # Cold start: only the most recent rows, not the table's whole history
+                response = client.table(ALERT_EVENTS_TABLE).select('id, symbol, data') \
+                    .order('id', desc=True).limit(ALERT_BUFFER_MAX_ROWS).execute()
+                self._merge(response.data[::-1])
+                self.loaded = True
+                return
+
+            after_id = max(self.last_seen_id - ALERT_EVENTS_OVERLAP_IDS, 0)
+            while True:
+                response = client.table(ALERT_EVENTS_TABLE).select('id, symbol, data') \
+                    .gt('id', after_id).order('id').limit(ALERT_EVENTS_PAGE_SIZE).execute()
+                self._merge(response.data)
+                if len(response.data) < ALERT_EVENTS_PAGE_SIZE:
+                    return
+                after_id = response.data[-1]['id']
+
+    def _merge(self, rows):
+        rows = [row for row in rows if row['id'] not in self._seen_ids]
+        if not rows:
+            return
+        records_by_symbol = {}
+        skipped = 0
+        for row in rows:
+            if not row.get('symbol') or not isinstance(row.get('data'), dict):
+                skipped += 1
+                continue
+            records_by_symbol.setdefault(row['symbol'], []).append(row['data'])
+
+        frames = dict(self._frames)
+        for symbol, records in records_by_symbol.items():
+            new_rows = alerts_from_records(records)
+            kept = 0 if new_rows is None else len(new_rows)
+            skipped += len(records) - kept
+            if kept:
+                frames[symbol] = append_alerts(frames.get(symbol), new_rows).tail(ALERT_BUFFER_MAX_ROWS).reset_index(drop=True)
+
+        if skipped:
+            self.skipped_rows += skipped
+            logger.warning("Skipped %d %s rows without a symbol or a valid timestamp", skipped, ALERT_EVENTS_TABLE)
+        self._frames = MappingProxyType(frames)
+        # Advance past every row, good or bad, so a bad row is never fetched again
+        self.last_seen_id = max(self.last_seen_id, max(row['id'] for row in rows))
+        self._seen_ids.update(row['id'] for row in rows)
+        oldest_id = self.last_seen_id - ALERT_EVENTS_OVERLAP_IDS
+        self._seen_ids = {row_id for row_id in self._seen_ids if row_id > oldest_id}
+
+class DataPoller:
+    """Server-wide background fetcher for the Supabase tables.
+
+    A single daemon thread polls each table that's in use once per cadence and
+    publishes an immutable snapshot. Every browser session reads from that
+    snapshot instead of calling Supabase itself, so backend QPS stays flat no
+    matter how many viewers are connected. Treat the published data as read-only.
+    """
+
+    def __init__(self, client, refresh_seconds, alert_events=None, health=None, schedule=None, data_client=None):
+        self._client = client
+        # Data downloads can have a longer timeout than the probes and stamp checks that have to fail fast
+        self._data_client = data_client or client
+        self.health = health or BackendHealth()
+        self.schedule = schedule
+        self._refresh_seconds = dict(refresh_seconds)
+        self.alert_events = alert_events
+        if alert_events is not None:
+            # Row-per-alert storage: one cursor fetch on the alerts cadence replaces the per-symbol blobs
+            alerts_cadence = self._refresh_seconds.pop('alerts_nq')
+            self._refresh_seconds.pop('alerts_es')
+            self._refresh_seconds[ALERT_EVENTS_TABLE] = alerts_cadence
+        self._snapshot = MappingProxyType({})
+        self._publish_lock = threading.Lock()
+        self._cold_fetch_lock = threading.Lock()
+        self._push_tables = frozenset()
+        self._refresh_requested = set()
+        self._wake = threading.Event()
+        self._bulk_rpc_available = True
+        self._version_counter = version_counter(1)
+        self._last_read = {}
+        self._downloaded_at = {}
+        self._untrusted_stamps = set()
+        self.errors = {}
+        self._thread = threading.Thread(target=self._run, name="supabase-poller", daemon=True)
+        self._thread.start()
+
+    def snapshot(self):
+        """Return the current immutable {table: TableSnapshot} mapping"""
+        return self._snapshot
+
+    def get(self, table_name):
+        """Return the latest snapshot for a table, fetching it inline on a cold start.
+
+        Raises the Supabase error if the table has never been fetched successfully,
+        so callers can fall back to their local JSON file.
+        """
+        idle = self._mark_read(table_name)
+        try:
+            return self._get(table_name, idle)
+        finally:
+            if idle:
+                self._wake.set()  # Back on the polling schedule, counted from the fetch above
+
+    def _get(self, table_name, idle):
+        snap = self._snapshot.get(table_name)
+        if idle and snap is not None and self.health.available() \
+                and monotonic() - snap.fetched_at > self._cadence(table_name):
+            # Nobody has read it lately so it hasn't been polled - check it's still current
+            try:
+                snap = self._request(self._poll, table_name)
+            except Exception as e:
+                self.errors[table_name] = e
+        if snap is not None:
+            return snap
+
+        with self._cold_fetch_lock:
+            snap = self._snapshot.get(table_name)
+            if snap is None and not self.health.available():
+                raise BackendUnavailable(f"Supabase circuit open, retrying in {self.health.retry_in():.0f}s")
+            if snap is None:
+                # One request fills every visible section, so the other loaders find their data ready
+                now = monotonic()
+                missing = [
+                    table for table in self._refresh_seconds
+                    if table not in self._snapshot and table != ALERT_EVENTS_TABLE and not self._idle(table, now)
+                ]
+                snap = self._try_poll_bulk(missing).get(table_name)
+            if snap is None:
+                snap = self._request(self._poll, table_name)
+        return snap
+
+    def prime(self, table_names):
+        """Mark the tables a rerun is about to show as read and fetch any that are cold in one request.
+
+        Called before the section loaders start, so a cold start is one bulk
+        round trip rather than a small batch or a select per loader.
+        """
+        table_names = [table for table in table_names if table in self._refresh_seconds]
+        idle = [self._mark_read(table_name) for table_name in table_names]
+        try:
+            if self.health.available():
+                with self._cold_fetch_lock:
+                    self._try_poll_bulk([table for table in table_names if table not in self._snapshot])
+        finally:
+            if any(idle):
+                self._wake.set()
+
+    def alert_frame(self, symbol):
+        """Per-symbol frame from row-per-alert storage (oldest first), loaded inline on a cold start"""
+        idle = self._mark_read(ALERT_EVENTS_TABLE)
+        try:
+            if not self.alert_events.loaded:
+                if not self.health.available():
+                    raise BackendUnavailable(f"Supabase circuit open, retrying in {self.health.retry_in():.0f}s")
+                self._request(self.alert_events.refresh, self._data_client)
+            return self.alert_events.frame(symbol)
+        finally:
+            if idle:
+                self._wake.set()
+
+    def apply_change(self, table_name, data, version=None):
+        """Replace a table's snapshot with data pushed from the change feed"""
+        # Pushes without a trustworthy updated_at still need a fresh stamp so parsed caches roll over
+        if version is None or table_name in self._untrusted_stamps:
+            version = f"push-{next(self._version_counter)}"
+        self._downloaded_at[table_name] = monotonic()
+        self._publish({table_name: TableSnapshot(data, version, monotonic())})
+
+    def request_refresh(self, table_name):
+        """Poll a table as soon as possible, e.g. after a change event that arrived without its data"""
+        self._refresh_requested.add(table_name)
+        self._wake.set()
+
+    def set_push_tables(self, tables):
+        """Stop polling tables the change feed keeps up to date (empty to resume polling)"""
+        self._push_tables = frozenset(tables)
+        # Poll them once more so anything changed while the feed was down is picked up
+        self._refresh_requested.update(self._push_tables)
+        self._wake.set()
+
+    def _idle(self, table_name, now):
+        # A visible section reads its table once per cadence, so tables nobody shows cost no requests
+        last_read = self._last_read.get(table_name)
+        return last_read is None or now - last_read > self._cadence(table_name) + TABLE_IDLE_SECONDS
+
+    def _mark_read(self, table_name):
+        """Note a read so the table is polled; True if it had gone idle.
+
+        The caller wakes the poller once its own inline fetch is done, so the
+        poller sees the fresh snapshot instead of fetching the table again.
+        """
+        now = monotonic()
+        idle = self._idle(table_name, now)
+        self._last_read[table_name] = now
+        return idle
+
+    def _request(self, fetch, *args):
+        """Run one Supabase call and report its outcome to the circuit breaker"""
+        try:
+            result = fetch(*args)
+        except Exception as e:
+            if is_backend_failure(e):
+                self.health.record_failure(e)
+            raise
+        self.health.record_success()
+        return result
+
+    def _probe(self):
+        """Cheap request to see whether Supabase is back; True if it answered"""
+        try:
+            self._client.table(BACKEND_PROBE_TABLE).select('updated_at').limit(1).execute()
+        except Exception as e:
+            self.health.record_failure(e)
+            return False
+        self.health.record_success()
+        return True
+
+    def _stamp_trusted(self, table_name, now):
+        """True if an unchanged updated_at can be taken to mean unchanged data"""
+        # The blob is still downloaded every STAMP_RECHECK_SECONDS in case a writer didn't move the stamp
+        current = self._snapshot.get(table_name)
+        return current is not None and current.version is not None \
+            and table_name not in self._untrusted_stamps \
+            and now - self._downloaded_at.get(table_name, now) < STAMP_RECHECK_SECONDS
+
+    def _downloaded(self, table_name, data, updated_at, fetched_at):
+        """Snapshot for a freshly downloaded blob, versioned by its stamp if the stamp can be trusted.
+
+        New data under an old stamp (a writer that doesn't set updated_at on a
+        project without the touch_updated_at trigger) or a NULL stamp stops the
+        table's stamp being trusted: from then on it is fully fetched on every
+        poll and versioned by content.
+        """
+        self._downloaded_at[table_name] = fetched_at
+        current = self._snapshot.get(table_name)
+        if updated_at is not None and table_name not in self._untrusted_stamps:
+            if current is None or updated_at != current.version:
+                return TableSnapshot(data, updated_at, fetched_at)
+            if data == current.data:
+                return current._replace(fetched_at=fetched_at)
+            self._untrusted_stamps.add(table_name)
+            logger.warning("%s changed without updated_at moving - is the touch_updated_at trigger installed? "
+                           "Fetching it in full on every poll from now on", table_name)
+        elif current is not None and data == current.data:
+            return current._replace(fetched_at=fetched_at)
+        return TableSnapshot(data, f"content-{next(self._version_counter)}", fetched_at)
+
+    def _poll(self, table_name):
+        current = self._snapshot.get(table_name)
+        if self._stamp_trusted(table_name, monotonic()):
+            # Only the version stamp crosses the wire when nothing changed
+            response = self._client.table(table_name).select('updated_at').eq('id', 1).single().execute()
+            if response.data['updated_at'] == current.version:
+                snap = current._replace(fetched_at=monotonic())
+                self._publish({table_name: snap})
+                self.errors.pop(table_name, None)
+                return snap
+
+        response = self._data_client.table(table_name).select('data, updated_at').eq('id', 1).single().execute()
+        snap = self._downloaded(table_name, response.data['data'], response.data['updated_at'], monotonic())
+        self._publish({table_name: snap})
+        self.errors.pop(table_name, None)
+        return snap
+
+    def _poll_bulk(self, table_names):
+        """Fetch several tables in one round trip through the snapshot RPC (see docs/SUPABASE_SETUP.md)"""
+        now = monotonic()
+        known_versions = {
+            table_name: self._snapshot[table_name].version
+            for table_name in table_names
+            if self._stamp_trusted(table_name, now)
+        }
+        response = self._data_client.rpc(SNAPSHOT_RPC, {
+            'tables': list(table_names),
+            'known_versions': known_versions
+        }).execute()
+        fetched_at = monotonic()
+        snaps = {}
+        for table_name, row in (response.data or {}).items():
+            if row is None:
+                continue
+            if 'data' in row:
+                snaps[table_name] = self._downloaded(table_name, row['data'], row['updated_at'], fetched_at)
+            elif table_name in self._snapshot:
+                # Unchanged since the version we sent - keep the data we already have
+                snaps[table_name] = self._snapshot[table_name]._replace(fetched_at=fetched_at)
+        self._publish(snaps)
+        for table_name in snaps:
+            self.errors.pop(table_name, None)
+        return snaps
+
+    def _try_poll_bulk(self, table_names):
+        """Bulk poll if the RPC is available; returns whatever was fetched"""
+        if len(table_names) < 2 or not self._bulk_rpc_available:
+            return {}
+        try:
+            return self._request(self._poll_bulk, table_names)
+        except Exception as e:
+            # PGRST202: function not found - this project doesn't have the RPC installed
+            if getattr(e, 'code', None) == 'PGRST202':
+                self._bulk_rpc_available = False
+            return {}
+
+    def _poll_tables(self, table_names):
+        """Poll a batch of tables, in one request when the RPC is available"""
+        if not self.health.available():
+            # Circuit open: keep the last snapshots and only probe once the backoff has passed
+            if not (self.health.probe_due() and self._probe()):
+                return
+            # Back up - catch up on every table in use, not just the ones due this tick
+            now = monotonic()
+            table_names = [table for table in self._refresh_seconds if not self._idle(table, now)]
+
+        if ALERT_EVENTS_TABLE in table_names:
+            table_names = [table for table in table_names if table != ALERT_EVENTS_TABLE]
+            try:
+                self._request(self.alert_events.refresh, self._data_client)
+                self.errors.pop(ALERT_EVENTS_TABLE, None)
+            except Exception as e:
+                self.errors[ALERT_EVENTS_TABLE] = e
+
+        fetched = self._try_poll_bulk(table_names)
+        remaining = [table for table in table_names if table not in fetched]
+
+        for table_name in remaining:
+            if not self.health.available():
+                break
+            try:
+                self._request(self._poll, table_name)
+            except Exception as e:
+                # Keep serving the last good snapshot; loaders fall back to JSON on a cold miss
+                self.errors[table_name] = e
+
+    def _publish(self, snaps):
+        # Copy-on-write so readers never see a half-updated mapping
+        with self._publish_lock:
+            updated = dict(self._snapshot)
+            updated.update(snaps)
+            self._snapshot = MappingProxyType(updated)
+
+    def _cadence(self, table_name):
+        # With a RefreshSchedule the cadence follows the market phase instead of refresh_seconds
+        if self.schedule is None:
+            return self._refresh_seconds[table_name]
+        return self.schedule.seconds(table_name)
+
+    def _poll_interval(self, table_name):
+        # Tables the change feed keeps current only get a slow updated_at check
+        if table_name in self._push_tables:
+            return max(self._cadence(table_name), PUSH_RECHECK_SECONDS)
+        return self._cadence(table_name)
+
+    def _run(self):
+        next_due = {table: 0.0 for table in self._refresh_seconds}
+        phase = self.schedule.phase() if self.schedule is not None else None
+        while True:
+            self._wake.clear()
+            if self.schedule is not None and self.schedule.phase() != phase:
+                # New phase: poll everything now rather than when the old (maybe hour-long) cadence is up
+                phase = self.schedule.phase()
+                self._refresh_requested.update(next_due)
+            now = monotonic()
+            due_tables = []
+            for table_name, due in next_due.items():
+                if self._idle(table_name, now):
+                    continue  # No visible section needs it - get() catches up when one does
+                if table_name in self._refresh_requested:
+                    self._refresh_requested.discard(table_name)
+                elif due > now:
+                    continue
+                elif table_name in self._snapshot and \
+                        now - self._snapshot[table_name].fetched_at < self._poll_interval(table_name):
+                    # Just fetched inline by get() or prime() - wait a full interval from then
+                    next_due[table_name] = self._snapshot[table_name].fetched_at + self._poll_interval(table_name)
+                    continue
+                due_tables.append(table_name)
+                next_due[table_name] = now + self._poll_interval(table_name)
+
+            self._poll_tables(due_tables)
+
+            now = monotonic()
+            polled_due = [due for table, due in next_due.items() if not self._idle(table, now)]
+            if not self.health.available():
+                # Wake for the recovery probe even while every table is on its slow push recheck
+                polled_due.append(monotonic() + self.health.retry_in())
+            if self.schedule is not None:
+                # Wake up for the next phase change even while every table is idle for an hour
+                polled_due.append(monotonic() + self.schedule.seconds_to_change())
+            timeout = max(0.0, min(polled_due) - monotonic()) if polled_due else None
+            self._wake.wait(timeout)
+
+@st.cache_resource
+def get_data_poller():
+    """Start the shared Supabase poller once per server process"""
+    alert_events = AlertEventBuffer() if supabase_setting("ALERT_STORAGE", "blob") == "rows" else None
+    return DataPoller(supabase, TABLE_REFRESH_SECONDS, alert_events, get_backend_health(), refresh_schedule,
+                      data_client=init_supabase(SUPABASE_FETCH_TIMEOUT_SECONDS))
+
+# ========================================
+# CHANGE FEED (PUSH UPDATES)
+# ========================================
+
+class LocalChangePublisher:
+    """In-process stand-in for the Supabase realtime feed.
+
+    Exposes the same subscribe() interface as SupabaseChangePublisher so the
+    push path can be exercised offline: publish() a table name and its new
+    data blob and every subscriber to that table is notified immediately.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, tables, on_change, on_status):
+        with self._lock:
+            self._subscribers.append((frozenset(tables), on_change))
+        on_status(True)
+
+    def publish(self, table_name, data, version=None):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for tables, on_change in subscribers:
+            if table_name in tables:
+                on_change(table_name, data, version)
+
+class SupabaseChangePublisher:
+    """Row-change notifications from Supabase realtime (postgres_changes).
+
+    The realtime client is async-only, so it runs on its own event loop in a
+    daemon thread. on_status(False) is reported whenever the channel drops so
+    the poller can take over until it resubscribes.
+    """
+
+    def __init__(self, url, key):
+        self._url = f"{url.rstrip('/')}/realtime/v1"
+        self._key = key
+
+    def subscribe(self, tables, on_change, on_status):
+        thread = threading.Thread(
+            target=asyncio.run,
+            args=(self._listen(tables, on_change, on_status),),
+            name="supabase-change-feed",
+            daemon=True
+        )
+        thread.start()
+
+    async def _listen(self, tables, on_change, on_status):
+        from realtime import AsyncRealtimeClient
+
+        def handle_change(payload):
+            change = payload.get('data', {})
+            record = change.get('record') or {}
+            if record.get('id') != 1:
+                return
+            if 'data' in record and not change.get('errors'):
+                on_change(change['table'], record['data'], record.get('updated_at'))
+            else:
+                # Realtime drops large values (e.g. years of gap history) and sets errors - fetch it instead
+                on_change(change['table'], None)
+
+        def handle_status(state, error):
+            on_status(state == 'SUBSCRIBED')
+
+        try:
+            client = AsyncRealtimeClient(self._url, token=self._key, params={'apikey': self._key})
+            await client.connect()
+            channel = client.channel('dashboard-tables')
+            for table_name in tables:
+                channel.on_postgres_changes('*', table=table_name, callback=handle_change)
+            await channel.subscribe(handle_status)
+            await asyncio.Future()  # Keep the loop alive; the client listens and reconnects on its own
+        except Exception:
+            on_status(False)
+
+class ChangeFeedSubscriber:
+    """Applies row-change notifications to the shared poller.
+
+    Each change replaces that table's snapshot and clears only that section's
+    cached data, so alert latency depends on the event rather than a poll
+    interval. While the feed is connected the poller stops polling the
+    subscribed tables (zero idle traffic); if it drops, polling resumes.
+    """
+
+    def __init__(self, poller, publisher, tables, invalidate):
+        self._poller = poller
+        self._tables = tuple(tables)
+        self._invalidate = invalidate
+        self.connected = False
+        publisher.subscribe(self._tables, self._on_change, self._on_status)
+
+    def _on_change(self, table_name, data, version=None):
+        if data is None:
+            # The event said the row changed but didn't carry it - have the poller fetch the row
+            self._poller.request_refresh(table_name)
+            return
+        self._poller.apply_change(table_name, data, version)
+        self._invalidate(table_name)
+
+    def _on_status(self, connected):
+        self.connected = connected
+        self._poller.set_push_tables(self._tables if connected else ())
+
+# ========================================
+# LOCAL JSON FILE SOURCE
+# ========================================
+
+# A JSON file's parsed contents and a version stamp built from its path, mtime and size
+FileSnapshot = namedtuple('FileSnapshot', ['data', 'version'])
+
+class JsonFileSource:
+    """Server-wide cache of the local JSON files used when Supabase isn't configured.
+
+    A file is re-read and re-parsed only when it really changed. An inotify
+    watch (through watchdog, if installed) marks files dirty as Sierra Chart
+    writes them, so a clean file is handed out without touching the disk;
+    without watchdog an (mtime, size) check stands in. Either way the dashboard
+    stops competing with Sierra Chart for I/O and CPU on every TTL expiry.
+    Treat the returned data as read-only.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._dirty = set()
+        self._watched_dirs = set()
+        self._observer = None
+        try:
+            from watchdog.observers import Observer
+
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._observer.start()
+        except Exception:
+            self._observer = None
+
+    def read(self, file_path):
+        """Return FileSnapshot(data, version) for a JSON file, parsing only when it changed"""
+        path = os.path.abspath(file_path)
+        watched = self._watch(os.path.dirname(path))
+
+        entry = self._entries.get(path)
+        if entry is not None and watched and path not in self._dirty:
+            return entry
+
+        # Clear the flag before reading so a write that lands mid-parse marks it dirty again
+        self._dirty.discard(path)
+        version = self.version(path)
+        if entry is not None and entry.version == version:
+            return entry
+
+        with open(path, 'r') as f:
+            try:
+                data = json.load(f)
+            except ValueError:
+                # Caught the writer mid-overwrite - keep the last good copy until it finishes
+                if entry is not None:
+                    return entry
+                raise
+
+        entry = FileSnapshot(data, version)
+        self._entries[path] = entry
+        return entry
+
+    def version(self, file_path):
+        """Version stamp of a JSON file (path, mtime, size) without reading it"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def dispatch(self, event):
+        """watchdog event handler: mark the touched file(s) dirty"""
+        # Our own reads show up as opened/closed_no_write - only real changes count
+        if event.is_directory or event.event_type not in ('modified', 'created', 'deleted', 'moved', 'closed'):
+            return
+        for changed_path in (event.src_path, getattr(event, 'dest_path', '')):
+            if changed_path:
+                self._dirty.add(os.path.abspath(os.fsdecode(changed_path)))
+
+    def _watch(self, directory):
+        if directory in self._watched_dirs:
+            return True
+        if self._observer is None:
+            return False
+        try:
+            self._observer.schedule(self, directory, recursive=False)
+        except Exception:
+            # Directory missing or inotify watch limit reached - stat checks still work
+            return False
+        self._watched_dirs.add(directory)
+        return True
+
+@st.cache_resource
+def get_json_file_source():
+    """Create the shared local JSON file cache once per server process"""
+    return JsonFileSource()
+
+# ========================================
+# APPEND-ONLY ALERT LOG
+# ========================================
+
+class AlertLogReader:
+    """Incremental reader for an append-only JSONL alert log (one alert per line).
+
+    Remembers the byte offset after the last complete line and parses only what
+    was appended since, so each read costs O(new alerts) instead of O(total).
+    A trailing line without its newline is left for the next read, so a
+    half-written alert is never seen. If the file shrinks (truncated) or its
+    inode changes (rotated), reading restarts from the top of the new file.
+    """
+
+    def __init__(self, file_path):
+        self._path = file_path
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._reset(None)
+
+    def read(self):
+        """Return FileSnapshot(frame, version) holding every alert in the log, sorted oldest first"""
+        with self._lock:
+            stat = os.stat(self._path)
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._reset(stat.st_ino)
+
+            if stat.st_size > self._offset:
+                with open(self._path, 'rb') as f:
+                    f.seek(self._offset)
+                    chunk = f.read(stat.st_size - self._offset)
+                complete = chunk.rfind(b'\n') + 1
+                if complete:
+                    try:
+                        self._append(chunk[:complete])
+                    except Exception as e:
+                        # Never retry a chunk that can't be merged, or the log stalls on it for good
+                        logger.warning("Skipped %d bytes of %s that could not be merged: %s", complete, self._path, e)
+                    self._offset += complete
+
+            version = f"{self._path}:{self._generation}:{self._offset}"
+            return FileSnapshot(self._frame, version)
+
+    def _reset(self, inode):
+        self._inode = inode
+        self._offset = 0
+        self._frame = None
+        self._generation += 1
+
+    def _append(self, chunk):
+        records = []
+        for line in chunk.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # Skip a corrupt line rather than stalling the whole log
+
+        # Bad records are dropped here too, so the offset always moves past them
+        new_rows = alerts_from_records(records)
+        if new_rows is not None:
+            self._frame = append_alerts(self._frame, new_rows)
+
+@st.cache_resource
+def get_alert_log_reader(file_path):
+    """One shared incremental reader per alert log file"""
+    return AlertLogReader(file_path)
+
+# ========================================
+# COLUMNAR HISTORY CACHE
+# ========================================
+
+# Long-history tables kept on disk as Arrow IPC segments, so a restart memory-maps them
+# back in instead of decoding the JSON blob and re-running pd.to_datetime
+HISTORY_TABLES = ('gap_details', 'ib_details', 'single_prints')
+HISTORY_MAX_SEGMENTS = 32  # Merge into one segment once this many appends pile up
+
+class HistoryStore:
+    """On-disk columnar cache for the long-history tables.
+
+    Each table is a directory of memory-mapped Arrow IPC segments plus a small
+    manifest with the data version and row count.
+    """
+
+    def __init__(self, cache_dir):
+        import pyarrow as pa
+
+        self._pa = pa
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # table -> data array last stored by this process. Only held in memory, so the first
+        # new version after a restart is written out in full as one segment
+        self._stored_data = {}
+
+    def load(self, table_name, version):
+        """Cached frame for table_name if the cache is at this version, else None"""
+        with self._lock:
+            manifest = self._read_manifest(table_name)
+            if manifest is None or manifest['version'] != version:
+                return None
+            return self._to_pandas(table_name, self._read_table(table_name, manifest['segments']))
+
+    def store(self, table_name, version, data):
+        """Bring the cache for table_name up to version from its full data array and return the frame"""
+        pa = self._pa
+        with self._lock:
+            manifest = self._read_manifest(table_name)
+            if manifest is not None and manifest['version'] == version:
+                return self._to_pandas(table_name, self._read_table(table_name, manifest['segments']))
+
+            # Rows before the first one that differs from what's on disk can be reused, so only
+            # today's row filling in or new rows at the end get framed again
+            previous = self._stored_data.get(table_name)
+            unchanged = 0
+            if manifest is not None and previous is not None and len(previous) == manifest['rows']:
+                unchanged = next((i for i, (old, new) in enumerate(zip(previous, data)) if old != new),
+                                 min(len(previous), len(data)))
+
+            if unchanged and unchanged == manifest['rows'] and len(manifest['segments']) < HISTORY_MAX_SEGMENTS:
+                # Pure append - write only the new rows
+                segments = list(manifest['segments'])
+                if len(data) > unchanged:
+                    segments.append(self._write_segment(table_name, self._frame(table_name, data[unchanged:])))
+            elif unchanged:
+                # Keep the unchanged prefix from the mapped table, reframe the rest, write one segment
+                parts = [self._read_table(table_name, manifest['segments']).slice(0, unchanged)]
+                if len(data) > unchanged:
+                    parts.append(self._frame(table_name, data[unchanged:]))
+                segments = [self._write_segment(table_name, pa.concat_tables(parts, promote_options='permissive'))]
+            else:
+                segments = [self._write_segment(table_name, self._frame(table_name, data))]
+
+            self._write_manifest(table_name, {'version': version, 'rows': len(data), 'segments': segments})
+            self._stored_data[table_name] = data
+            self._remove_stale_segments(table_name, segments)
+            return self._to_pandas(table_name, self._read_table(table_name, segments))
+
+    def _frame(self, table_name, rows):
+        df = apply_schema(pd.DataFrame(rows), SECTION_SCHEMAS[table_name])
+        return self._pa.Table.from_pandas(df, preserve_index=False)
+
+    def _to_pandas(self, table_name, table):
+        # Re-assert the schema - segments framed from different batches may have been promoted
+        return apply_schema(table.to_pandas(), SECTION_SCHEMAS[table_name])
+
+    def _read_table(self, table_name, segments):
+        pa = self._pa
+        tables = [pa.ipc.open_file(pa.memory_map(str(self.cache_dir / table_name / segment))).read_all()
+                  for segment in segments]
+        return pa.concat_tables(tables, promote_options='permissive')
+
+    def _write_segment(self, table_name, table):
+        pa = self._pa
+        table_dir = self.cache_dir / table_name
+        table_dir.mkdir(exist_ok=True)
+        segment = f"{os.urandom(6).hex()}.arrow"
+        tmp_path = table_dir / f"{segment}.tmp"
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, table_dir / segment)
+        return segment
+
+    def _read_manifest(self, table_name):
+        try:
+            with open(self.cache_dir / table_name / 'manifest.json', 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, table_name, manifest):
+        path = self.cache_dir / table_name / 'manifest.json'
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def _remove_stale_segments(self, table_name, segments):
+        keep = set(segments)
+        for path in (self.cache_dir / table_name).glob('*.arrow'):
+            if path.name not in keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # Still mapped elsewhere (Windows) - removed on a later write
+
+@st.cache_resource
+def get_history_store():
+    """Create the on-disk history cache once per server process (None if it can't be used)"""
+    try:
+        cache_dir = st.secrets.get("HISTORY_CACHE_DIR")
+    except Exception:
+        cache_dir = None
+    try:
+        return HistoryStore(cache_dir or Path(__file__).parent / ".cache" / "history")
+    except Exception:
+        return None  # pyarrow missing or cache dir not writable - build frames from JSON as before
+
+# ========================================
+# SECTION TIMING
+# ========================================
+
+METRICS_FILE_MAX_BYTES = 5 * 1024 * 1024  # Roll over to <file>.1 past this size
+
+# The timing record of the load in progress on this thread, so the loader cache can note hit/miss and age
+_active_load = threading.local()
+
+def data_rows(data):
+    """Row count for a loaded section (None for dict payloads)"""
+    if data is None:
+        return 0
+    if isinstance(data, (pd.DataFrame, list)):
+        return len(data)
+    return None
+
+class SectionTimer:
+    """Load time, cache hit/miss, row count and render time per section for one run"""
+
+    def __init__(self, run):
+        self.run = run
+        self.records = {}
+
+    def load(self, section, loader, *args):
+        record = self._record(section)
+        record['cache'] = 'hit'
+        _active_load.record = record
+        try:
+            data = self._measure(record, 'load', loader, *args)
+        finally:
+            _active_load.record = None
+        record['rows'] = data_rows(data)
+        return data
+
+    def render(self, section, render_func):
+        self._measure(self._record(section), 'render', render_func)
+
+    def stale(self, section, age):
+        """Note that a section showed its last good data, loaded `age` seconds ago"""
+        self._record(section)['stale_s'] = None if age is None else round(age, 1)
+
+    def finish(self):
+        """Publish this run's numbers to the sidebar panel and, if enabled, the metrics file"""
+        metrics = st.session_state.section_metrics
+        for section in [section for section, record in metrics.items()
+                        if record.get('run') == self.run and section not in self.records]:
+            del metrics[section]  # Hidden since the last run
+        metrics.update(self.records)
+        log = get_metrics_log()
+        if log is not None and (log.always or st.session_state.get('show_section_timings')):
+            log.write(self.run, self.records.values())
+
+    def _record(self, section):
+        return self.records.setdefault(section, {'section': section, 'run': self.run})
+
+    def _measure(self, record, step, func, *args):
+        start = perf_counter()
+        result = func(*args)
+        record[f'{step}_ms'] = round((perf_counter() - start) * 1000, 2)
+        return result
+
+class MetricsLog:
+    """Rolling JSONL file of section timings, shared by every session in the process"""
+
+    def __init__(self, path, always=False, max_bytes=METRICS_FILE_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.always = always
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def write(self, run, records):
+        timestamp = datetime.now(pytz.utc).isoformat()
+        lines = ''.join(json.dumps(dict(record, run=run, timestamp=timestamp)) + '\n' for record in records)
+        with self._lock:
+            try:
+                if self.path.exists() and self.path.stat().st_size + len(lines) > self.max_bytes:
+                    os.replace(self.path, f"{self.path}.1")
+                with open(self.path, 'a') as f:
+                    f.write(lines)
+            except OSError:
+                pass  # Metrics are best effort - never break a rerun over them
+
+@st.cache_resource
+def get_metrics_log():
+    """Create the shared metrics file writer once per server process (None if it can't be used)"""
+    try:
+        path = st.secrets.get("METRICS_FILE")
+        always = bool(st.secrets.get("SECTION_METRICS", False))
+    except Exception:
+        path, always = None, False
+    try:
+        return MetricsLog(path or Path(__file__).parent / ".cache" / "metrics" / "section_metrics.jsonl", always)
+    except OSError:
+        return None
+
+def render_timing_panel():
+    """Sidebar table of the latest per-section timings"""
+    st.markdown("### ⏱️ Section Timings")
+    metrics = st.session_state.section_metrics
+    if not metrics:
+        st.caption("No timings yet")
+        return
+
+    columns = ['section', 'load_ms', 'cache', 'age_s', 'rows', 'render_ms', 'stale_s']
+    timings = pd.DataFrame(list(metrics.values())).reindex(columns=columns)
+    timings.columns = ['Section', 'Load (ms)', 'Cache', 'Age (s)', 'Rows', 'Render (ms)', 'Stale (s)']
+    st.dataframe(timings, use_container_width=True, hide_index=True)
+
+    log = get_metrics_log()
+    if log is not None:
+        st.caption(f"Also logged to {log.path}")
+
+# ========================================
+# STALE-WHILE-REVALIDATE CACHE
+# ========================================
+
+SWR_REFRESH_WORKERS = 4
+
+# A cached loader result and when it was loaded (monotonic seconds)
+SwrEntry = namedtuple('SwrEntry', ['value', 'loaded_at'])
+
+class SwrCache:
+    """Section loader results shared by every session, refreshed in the background.
+
+    Values are shared rather than copied like st.cache_data's, so treat them
+    as read-only.
+    """
+
+    def __init__(self, max_workers=SWR_REFRESH_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="swr-refresh")
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._in_flight = {}
+
+    def get(self, key, ttl, loader, *args):
+        """Return (value, age in seconds, status) - status is 'hit', 'refreshing' or 'miss'.
+
+        The last good value comes back straight away. Once it is older than ttl
+        the read also starts a background refresh (one per key at a time) that a
+        later read picks up. Only the first read of a key loads inline, and
+        concurrent first reads share that load.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = monotonic() - entry.loaded_at
+                if age < ttl:
+                    return entry.value, age, 'hit'
+                refresh = None
+                if key not in self._in_flight:
+                    refresh = self._in_flight[key] = self._executor.submit(loader, *args)
+            else:
+                future = self._in_flight.get(key)
+                inline = future is None
+                if inline:
+                    future = self._in_flight[key] = Future()
+
+        if entry is not None:
+            # Outside the lock: a refresh that already finished runs the callback right here
+            if refresh is not None:
+                refresh.add_done_callback(functools.partial(self._finished, key))
+            return entry.value, age, 'refreshing'
+
+        if inline:
+            try:
+                future.set_result(loader(*args))
+            except Exception as e:
+                future.set_exception(e)
+            self._finished(key, future)
+        value = future.result()
+        return value, 0.0, 'miss'
+
+    def age(self, key):
+        """Seconds since the key's value was loaded (None if it isn't cached)"""
+        entry = self._entries.get(key)
+        return None if entry is None else monotonic() - entry.loaded_at
+
+    def clear(self, *key_prefix):
+        """Drop every entry whose key starts with key_prefix (all of them when empty).
+
+        A refresh already in flight for a dropped key is discarded when it finishes,
+        so the next read loads the current data inline.
+        """
+        with self._lock:
+            for entries in (self._entries, self._in_flight):
+                for key in [key for key in entries if key[:len(key_prefix)] == key_prefix]:
+                    del entries[key]
+
+    def _finished(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is not future:
+                return  # Cleared while it ran
+            del self._in_flight[key]
+            if future.exception() is not None:
+                return  # Keep serving the previous value
+            value = future.result()
+            if value is not None or key not in self._entries:
+                self._entries[key] = SwrEntry(value, monotonic())
+
+@st.cache_resource
+def get_swr_cache():
+    """Create the shared loader cache once per server process"""
+    return SwrCache()
+
+def stale_while_revalidate(ttl):
+    """Cache a loader in the shared SwrCache, refreshing results older than ttl seconds.
+
+    ttl may also be a function of the loader's arguments, looked up on every call.
+
+    The cache status and the age of the data are recorded on the SectionTimer
+    timing the call. Like st.cache_data, the wrapper has .clear(*args); .age(*args)
+    says how old the cached result is.
+    """
+    def decorator(func):
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            seconds = ttl(*args) if callable(ttl) else ttl
+            value, age, status = get_swr_cache().get((name,) + args, seconds, func, *args)
+            record = getattr(_active_load, 'record', None)
+            if record is not None:
+                record['cache'] = status
+                record['age_s'] = round(age, 1)
+            return value
+
+        wrapper.clear = lambda *args: get_swr_cache().clear(name, *args)
+        wrapper.age = lambda *args: get_swr_cache().age((name,) + args)
+        return wrapper
+    return decorator
+
+# ========================================
+# PARALLEL SECTION LOADING
+# ========================================
+
+# Longest a rerun waits on each section's loader before showing its last good data (seconds).
+# The history tables get longer because a cold load decodes years of JSON.
+SECTION_LOAD_TIMEOUTS = {
+    "Gap Stats": 5.0,
+    "Initial Balance": 5.0,
+    "Single Prints": 5.0,
+}
+SECTION_LOAD_TIMEOUT_DEFAULT = 2.0
+SECTION_FIRST_LOAD_TIMEOUT = 15.0  # No last good data to fall back on yet, so wait longer for a first paint
+SECTION_LOADER_WORKERS = 12
+
+# A section's data for this run; stale when its loader missed the deadline (age: seconds since it was loaded)
+SectionResult = namedtuple('SectionResult', ['data', 'stale', 'age'])
+
+class SectionLoader:
+    """Runs the section loaders concurrently on a server-wide thread pool.
+
+    Every section has its own timeout. A loader still running at its deadline
+    keeps going in the background and the section shows its last good data,
+    marked stale; a later rerun picks up the finished result. Only one load
+    per source is in flight at a time, so a hung backend can't drain the pool.
+    A cold rerun waits about as long as its slowest source, not the sum of all.
+
+    Sources are tracked by the loader's name and arguments rather than the
+    function object, because every full rerun of the script defines new ones.
+    """
+
+    def __init__(self, max_workers=SECTION_LOADER_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="section-loader")
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._last_good = {}
+
+    def load_all(self, timer, sources):
+        """Load {section: (loader, *args)} concurrently; returns {section: SectionResult}"""
+        started = monotonic()
+        futures = {section: self._submit(timer, section, source) for section, source in sources.items()}
+
+        results = {}
+        for section, future in futures.items():
+            timeout = SECTION_LOAD_TIMEOUTS.get(section, SECTION_LOAD_TIMEOUT_DEFAULT)
+            last_good = self._last_good.get(self._key(sources[section]))
+            if last_good is None:
+                timeout = max(timeout, SECTION_FIRST_LOAD_TIMEOUT)
+            try:
+                data = future.result(max(0.0, started + timeout - monotonic()))
+                loader, *args = sources[section]
+                results[section] = SectionResult(data, False, loader.age(*args))
+            except FutureTimeoutError:
+                data, loaded_at = last_good if last_good is not None else (None, None)
+                age = None if loaded_at is None else monotonic() - loaded_at
+                results[section] = SectionResult(data, True, age)
+                timer.stale(section, age)
+        return results
+
+    @staticmethod
+    def _key(source):
+        loader, *args = source
+        return (loader.__qualname__, *args)
+
+    def _submit(self, timer, section, source):
+        key = self._key(source)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(timer.load, section, *source)
+            self._in_flight[key] = future
+        # Outside the lock: a future that already finished runs the callback right here
+        future.add_done_callback(functools.partial(self._finished, key))
+        return future
+
+    def _finished(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            if not future.cancelled() and future.exception() is None and future.result() is not None:
+                self._last_good[key] = (future.result(), monotonic())
+
+@st.cache_resource
+def get_section_loader():
+    """Start the shared section loader pool once per server process"""
+    return SectionLoader()
+
+def render_stale_badge(result):
+    """Badge above a section whose loader missed its deadline this run"""
+    if result.data is None:
+        st.caption("⏳ Still loading - will show on the next refresh")
+    else:
+        st.markdown(f'<span class="stale-badge">⚠️ STALE · showing data from {result.age:.0f}s ago</span>',
+                    unsafe_allow_html=True)
+
+def render_data_age(result):
+    """Small "data 3s old" note above a section"""
+    if result.age is not None:
+        st.caption(f"🕒 data {result.age:.0f}s old")
+
 # ========================================
 # DATA LOADING FUNCTIONS
 # ========================================
 
-@st.cache_data(ttl=5)  # Cache for 5 seconds (real-time data)
+# Declared column types for every table whose data blob becomes a DataFrame, applied once
+# at ingest: categoricals for repeated labels, plain bools for flags (missing = False),
+# nullable ints for counts/minutes, float32 for prices and ratios (tick-sized values are
+# exact well past any index level), datetimes for timestamps. Unlisted columns are untouched.
+ALERT_SCHEMA = {
+    'timestamp': 'datetime',
+    'symbol': 'category',
+    'priority': 'category',
+    'price': 'float32',
+}
+
+SECTION_SCHEMAS = {
+    'gap_details': {
+        'date': 'datetime',
+        'prior_day_high': 'float32',
+        'prior_day_low': 'float32',
+        'current_open': 'float32',
+        'gap_size': 'float32',
+        'gap_fill_target': 'float32',
+        'atr': 'float32',
+        'gap_pct_atr': 'float32',
+        'category': 'category',
+        'direction': 'category',
+        'pivot_high': 'float32',
+        'pivot_low': 'float32',
+        'range_position': 'category',
+        'filled': 'bool',
+        'minutes_to_fill': 'Int32',
+        'fill_bar_index': 'Int32',
+    },
+    'ib_details': {
+        'symbol': 'category',
+        'ib_high': 'float32',
+        'ib_low': 'float32',
+        'ib_range': 'float32',
+        'atr': 'float32',
+        'ib_pct_atr': 'float32',
+        'current_price': 'float32',
+        'extension_30_level': 'float32',
+        'extension_50_level': 'float32',
+        'extension_100_level': 'float32',
+        'current_extension_pct': 'float32',
+        'reached_30': 'bool',
+        'reached_50': 'bool',
+        'reached_100': 'bool',
+        'time_to_30': 'Int32',
+        'time_to_50': 'Int32',
+        'direction': 'category',
+    },
+    'single_prints': {
+        'symbol': 'category',
+        'price_level': 'float32',
+        'session': 'category',
+        'age_days': 'Int32',
+        'current_price': 'float32',
+        'distance_from_current': 'float32',
+        'filled': 'bool',
+        'fill_time_minutes': 'Int32',
+        'direction_from_current': 'category',
+    },
+    'alerts_nq': ALERT_SCHEMA,
+    'alerts_es': ALERT_SCHEMA,
+}
+
+def apply_schema(df, schema):
+    """Cast a frame's columns to a declared schema in place and return it.
+
+    Columns that are missing or already the right type are skipped, and a column
+    whose values don't fit (say a fractional minute count) keeps its inferred
+    type rather than failing the whole load.
+    """
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        try:
+            if dtype == 'datetime':
+                if not pd.api.types.is_datetime64_any_dtype(values):
+                    df[column] = pd.to_datetime(values)
+            elif dtype == 'bool':
+                if values.dtype != bool:
+                    df[column] = values.astype('boolean').fillna(False).astype(bool)
+            elif str(values.dtype) != dtype:
+                df[column] = values.astype(dtype)
+        except (TypeError, ValueError):
+            pass
+    return df
+
+@st.cache_data(max_entries=64)
+def build_section_data(table_name, version, _data):
+    """Turn a table's data blob into the DataFrame or dict its loader returns.
+
+    Cached per (table, version) - the blob itself is not hashed - so an unchanged
+    table is never re-framed or re-typed. DataFrames carry
+    the version in df.attrs['version'] so derived indexes can be cached on it too.
+    """
+    if not _data:  # Empty array/object
+        return None
+    if table_name not in SECTION_SCHEMAS:
+        return _data
+
+    df = apply_schema(pd.DataFrame(_data), SECTION_SCHEMAS[table_name])
+    df.attrs['version'] = version
+    if table_name in ('alerts_nq', 'alerts_es'):
+        df = sort_alerts(df)
+    return df
+
+@st.cache_data(max_entries=16)
+def build_history_data(table_name, version, _read_data):
+    """build_section_data for the HISTORY_TABLES, backed by the on-disk history cache.
+
+    _read_data returns the table's data array. It is only called - and the JSON
+    only decoded - when the on-disk cache isn't already at this version.
+    """
+    store = get_history_store()
+    df = None
+    if store is not None:
+        try:
+            df = store.load(table_name, version)
+        except Exception as e:
+            logger.warning("History cache for %s unreadable, rebuilding: %s", table_name, e)
+    if df is None:
+        data = _read_data()
+        if store is None or not data or not isinstance(data, list):
+            return build_section_data(table_name, version, data)
+        try:
+            df = store.store(table_name, version, data)
+        except Exception as e:
+            # Disk full, or rows Arrow can't frame (mixed-type columns) - pandas still can
+            logger.warning("History cache for %s not updated, building in memory: %s", table_name, e)
+            return build_section_data(table_name, version, data)
+    df.attrs['version'] = version
+    return df
+
+class SourceChanged(Exception):
+    """A local file changed between taking its version and reading it"""
+
+def build_json_history_data(table_name, file_path, attempts=3):
+    """build_history_data for a local JSON file, cached under the version of the bytes actually read.
+
+    The version is taken first so an up-to-date on-disk cache skips the read.
+    If the file is rewritten in between, the read returns data that doesn't
+    match that version; it is then taken again rather than caching new data
+    under the old version (or old data under the new one).
+    """
+    source = get_json_file_source()
+    for attempt in range(attempts):
+        version = source.version(file_path)
+
+        def read_data():
+            snapshot = source.read(file_path)
+            if snapshot.version != version:
+                raise SourceChanged(file_path)
+            return snapshot.data
+
+        try:
+            return build_history_data(table_name, version, read_data)
+        except SourceChanged:
+            sleep(0.05)  # Let the writer finish
+    raise SourceChanged(file_path)
+
+@stale_while_revalidate(ttl=phase_ttl('gap_details'))  # Gap forms pre-market, fills during RTH
 def load_gap_data(file_path):
     """Load gap details from Supabase or JSON file"""
     try:
         # Try Supabase first
-        if supabase:
-            response = supabase.table('gap_details').select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data:  # Empty array
-                return None
-            df = pd.DataFrame(data)
-            df['date'] = pd.to_datetime(df['date'])
-            return df
+        if supabase and backend_available():
+            snap = get_data_poller().get('gap_details')
+            return build_history_data('gap_details', snap.version, lambda: snap.data)
     except Exception as e:
-        st.warning(f"Supabase error, falling back to JSON: {e}")
+        logger.warning("Supabase error, falling back to JSON: %s", e)
 
     # Fallback to JSON file
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        if not data:
-            return None
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['date'])
-        return df
+        return build_json_history_data('gap_details', file_path)
     except Exception as e:
         return None
 
-@st.cache_data(ttl=5)  # Cache for 5 seconds (real-time data)
+@stale_while_revalidate(ttl=phase_ttl('ib_details'))
 def load_ib_data(file_path):
     """Load Initial Balance data from Supabase or JSON file"""
     try:
         # Try Supabase first
-        if supabase:
-            response = supabase.table('ib_details').select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data:  # Empty array
-                return None
-            return pd.DataFrame(data)
+        if supabase and backend_available():
+            snap = get_data_poller().get('ib_details')
+            return build_history_data('ib_details', snap.version, lambda: snap.data)
     except:
         pass
 
     # Fallback to JSON file
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        if not data:
-            return None
-        return pd.DataFrame(data)
+        return build_json_history_data('ib_details', file_path)
     except:
         return None
 
-@st.cache_data(ttl=5)  # Cache for 5 seconds (real-time data)
+@stale_while_revalidate(ttl=phase_ttl('single_prints'))
 def load_single_prints_data(file_path):
     """Load Single Prints data from Supabase or JSON file"""
     try:
         # Try Supabase first
-        if supabase:
-            response = supabase.table('single_prints').select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data:  # Empty array
-                return None
-            return pd.DataFrame(data)
+        if supabase and backend_available():
+            snap = get_data_poller().get('single_prints')
+            return build_history_data('single_prints', snap.version, lambda: snap.data)
     except:
         pass
 
     # Fallback to JSON file
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        if not data:
-            return None
-        return pd.DataFrame(data)
+        return build_json_history_data('single_prints', file_path)
     except:
         return None
 
-@st.cache_data(ttl=1)  # Refresh alerts every 1 second
+@stale_while_revalidate(ttl=refresh_schedule.seconds)  # ttl per alerts table from the refresh schedule
 def load_alerts_data(table_name):
-    """Load real-time alerts from Supabase or JSON file"""
+    """Load real-time alerts from Supabase or JSON file, sorted oldest first"""
     try:
         # Try Supabase first
-        if supabase:
-            response = supabase.table(table_name).select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data:  # Empty array
-                return None
-            df = pd.DataFrame(data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            return df
+        if supabase and backend_available():
+            poller = get_data_poller()
+            if poller.alert_events is not None:
+                return poller.alert_frame(alert_symbol(table_name))
+            snap = poller.get(table_name)
+            return build_section_data(table_name, snap.version, snap.data)
     except:
         pass
 
+    # Fallback to the append-only log if the study writes one
+    log_path = f"{table_name}.jsonl"
+    if os.path.exists(log_path):
+        try:
+            return get_alert_log_reader(log_path).read().data
+        except:
+            return None
+
     # Fallback to JSON file
     file_path = f"{table_name}.json"
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        if not data:
-            return None
-        df = pd.DataFrame(data)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        return df
+        snap = get_json_file_source().read(file_path)
+        return build_section_data(table_name, snap.version, snap.data)
     except:
         return None
 
-@st.cache_data(ttl=30)  # Refresh every 30 seconds
+@stale_while_revalidate(ttl=phase_ttl('market_environment'))
 def load_environment_data(file_path):
     """Load Market Environment data from Supabase or JSON file"""
     try:
         # Try Supabase first
-        if supabase:
-            response = supabase.table('market_environment').select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data:
-                return None
-            return data
+        if supabase and backend_available():
+            snap = get_data_poller().get('market_environment')
+            return build_section_data('market_environment', snap.version, snap.data)
     except:
         pass
 
     # Fallback to JSON file
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data if data else None
+        snap = get_json_file_source().read(file_path)
+        return build_section_data('market_environment', snap.version, snap.data)
     except:
         return None
 
-@st.cache_data(ttl=60)  # Refresh every minute
+@stale_while_revalidate(ttl=phase_ttl('risk_assessment'))
 def load_risk_assessment_data(file_path):
     """Load Risk Assessment data from Supabase or JSON file"""
     try:
         # Try Supabase first
-        if supabase:
-            response = supabase.table('risk_assessment').select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data:
-                return None
-            return data
+        if supabase and backend_available():
+            snap = get_data_poller().get('risk_assessment')
+            return build_section_data('risk_assessment', snap.version, snap.data)
     except:
         pass
 
     # Fallback to JSON file
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data if data else None
+        snap = get_json_file_source().read(file_path)
+        return build_section_data('risk_assessment', snap.version, snap.data)
     except:
         return None
 
-@st.cache_data(ttl=300)  # Refresh every 5 minutes (static after 6 AM generation)
+@stale_while_revalidate(ttl=phase_ttl('daily_context'))  # Static after 6 AM generation
 def load_daily_context_data(file_path):
     """Load Daily Market Context data from Supabase or JSON file"""
     try:
-        if supabase:
-            response = supabase.table('daily_context').select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data:
-                return None
-            return data
+        if supabase and backend_available():
+            snap = get_data_poller().get('daily_context')
+            return build_section_data('daily_context', snap.version, snap.data)
     except:
         pass
 
     # Fallback to JSON file
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data if data else None
+        snap = get_json_file_source().read(file_path)
+        return build_section_data('daily_context', snap.version, snap.data)
     except:
         return None
 
-@st.cache_data(ttl=5)  # Refresh every 5 seconds (updates until 10:00 AM, then static)
+@stale_while_revalidate(ttl=phase_ttl('opening_range'))  # Updates until 10:00 AM, then static
 def load_opening_range_data(file_path):
     """Load Opening Range data from Supabase or JSON file"""
     try:
-        if supabase:
-            response = supabase.table('opening_range').select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data:
-                return None
-            return data
+        if supabase and backend_available():
+            snap = get_data_poller().get('opening_range')
+            return build_section_data('opening_range', snap.version, snap.data)
     except:
         pass
 
     # Fallback to JSON file
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data if data else None
+        snap = get_json_file_source().read(file_path)
+        return build_section_data('opening_range', snap.version, snap.data)
     except:
         return None
 
-@st.cache_data(ttl=5)  # Refresh every 5 seconds (real-time)
+@stale_while_revalidate(ttl=phase_ttl('stage_progression'))
 def load_stage_progression_data(file_path):
     """Load 3-Stage Progression data from Supabase or JSON file"""
     try:
-        if supabase:
-            response = supabase.table('stage_progression').select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data or len(data) == 0:
-                return []
-            return data
+        if supabase and backend_available():
+            snap = get_data_poller().get('stage_progression')
+            return build_section_data('stage_progression', snap.version, snap.data) or []
     except:
         pass
 
     # Fallback to JSON file
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data if (data and len(data) > 0) else []
+        snap = get_json_file_source().read(file_path)
+        return build_section_data('stage_progression', snap.version, snap.data) or []
     except:
         return []
 
-@st.cache_data(ttl=30)  # Refresh every 30 seconds (updates throughout session)
+@stale_while_revalidate(ttl=phase_ttl('tpo_profile'))  # Updates throughout the session
 def load_tpo_profile_data(file_path):
     """Load TPO/Market Profile data from Supabase or JSON file"""
     try:
-        if supabase:
-            response = supabase.table('tpo_profile').select('data').eq('id', 1).single().execute()
-            data = response.data['data']
-            if not data:
-                return None
-            return data
+        if supabase and backend_available():
+            snap = get_data_poller().get('tpo_profile')
+            return build_section_data('tpo_profile', snap.version, snap.data)
     except:
         pass
 
     # Fallback to JSON file
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data if data else None
+        snap = get_json_file_source().read(file_path)
+        return build_section_data('tpo_profile', snap.version, snap.data)
     except:
         return None
 
+def invalidate_section_cache(table_name):
+    """Clear the cached data of the one section backed by a table"""
+    if table_name in ('alerts_nq', 'alerts_es'):
+        load_alerts_data.clear(table_name)
+        return
+
+    section_loaders = {
+        'gap_details': load_gap_data,
+        'ib_details': load_ib_data,
+        'single_prints': load_single_prints_data,
+        'market_environment': load_environment_data,
+        'risk_assessment': load_risk_assessment_data,
+        'daily_context': load_daily_context_data,
+        'opening_range': load_opening_range_data,
+        'stage_progression': load_stage_progression_data,
+        'tpo_profile': load_tpo_profile_data,
+    }
+    if table_name in section_loaders:
+        section_loaders[table_name].clear()
+
+@st.cache_resource
+def get_change_feed():
+    """Subscribe the shared poller to Supabase row changes once per server process"""
+    # Off unless asked for: it needs the tables added to the realtime publication (docs/SUPABASE_SETUP.md)
+    if supabase_setting("CHANGE_FEED", "off") != "supabase":
+        return None
+    publisher = SupabaseChangePublisher(supabase_setting("SUPABASE_URL"), supabase_setting("SUPABASE_KEY"))
+    return ChangeFeedSubscriber(get_data_poller(), publisher, TABLE_REFRESH_SECONDS, invalidate_section_cache)
+
+if supabase:
+    get_change_feed()
+
 # ========================================
 # UTILITY FUNCTIONS
 # ========================================
 
-def generate_alert_id(symbol, alert):
-    """Generate a consistent unique ID for an alert"""
-    # Use timestamp as string, type, and first 50 chars of message
-    timestamp_str = str(alert['timestamp'])
-    alert_type = alert.get('type', '')
-    message = alert.get('message', '')[:50]  # First 50 chars to keep ID reasonable
-    return f"{symbol}_{timestamp_str}_{alert_type}_{message}"
+def alert_symbol(table_name):
+    """Symbol for an alerts table, e.g. alerts_nq -> NQ"""
+    return table_name.split('_')[1].upper()
+
+def generate_alert_ids(df, symbol):
+    """Generate consistent unique IDs for a whole frame of alerts at once.
+
+    Computed on the visible window slice (stored as the alert_id column) so
+    sound, toast, feed and Clear handlers filter with isin() instead of
+    building IDs row by row. Each ID is a 64-bit hash, so per-session alert
+    state holds small ints rather than long strings.
+    """
+    # Symbol, wall-clock timestamp, type, and first 50 chars of message
+    key = pd.DataFrame({
+        'symbol': symbol,
+        'timestamp': alert_wall_time(df['timestamp']).dt.as_unit('ns'),
+        'type': df['type'].fillna('').astype(str) if 'type' in df.columns else '',
+        'message': df['message'].fillna('').astype(str).str[:50] if 'message' in df.columns else '',
+    }, index=df.index)
+    return pd.util.hash_pandas_object(key, index=False)
+
+class AlertContext:
+    """Every symbol's alerts for one rerun, loaded and windowed exactly once.
+
+    Built once per run of the alert panel and passed to toasts, sounds, the
+    feeds and the Clear handlers, so a run decodes, sorts and slices each
+    symbol once no matter how many places show it. The window
+    frames are shared between those consumers and must be treated as read-only.
+    """
+
+    def __init__(self, timer, symbols=ALERT_SYMBOLS):
+        windows = {}
+        for symbol in symbols:
+            df = timer.load(f"{symbol} Alerts", load_alerts_data, f"alerts_{symbol.lower()}")
+            windows[symbol] = None if df is None else alert_window(df, symbol, st.session_state.dismissed_alerts)
+        self._windows = MappingProxyType(windows)
+        self._sounds_checked = set()
+
+    def window(self, symbol):
+        """Visible alerts for a symbol (newest first, with alert_id), or None if there is no data"""
+        return self._windows.get(symbol)
+
+    def check_sounds(self, symbol):
+        """Play the new-alert sound for a symbol at most once per rerun"""
+        if symbol not in self._sounds_checked:
+            self._sounds_checked.add(symbol)
+            check_and_play_alert_sounds(self.window(symbol), symbol)
+
+    def dismiss_all(self, symbol):
+        """Mark every visible alert for a symbol as dismissed (only for this session)"""
+        df = self.window(symbol)
+        if df is not None:
+            st.session_state.dismissed_alerts.update(df)
 
 def check_and_play_alert_sounds(df, symbol):
-    """Check for new alerts and play sounds if enabled"""
+    """Check for new alerts and play sounds if enabled (df is an alert_window frame)"""
     if not st.session_state.sound_enabled or df is None or len(df) == 0:
         return
 
-    # Check each alert to see if it's new
-    new_alerts_by_priority = {'critical': 0, 'warning': 0, 'info': 0}
-
-    for idx, alert in df.iterrows():
-        alert_id = generate_alert_id(symbol, alert)
+    # New alerts are the ones in the window neither dismissed nor seen before
+    active_alerts = df[~st.session_state.dismissed_alerts.isin(df['alert_id'])]
+    new_alerts = active_alerts[~st.session_state.seen_alerts.isin(active_alerts['alert_id'])]
+    st.session_state.seen_alerts.update(new_alerts)
 
-        # Skip dismissed alerts
-        if alert_id in st.session_state.dismissed_alerts:
-            continue
-
-        # Check if this is a new alert
-        if alert_id not in st.session_state.seen_alerts:
-            st.session_state.seen_alerts.add(alert_id)
-            priority = alert.get('priority', 'info')
-            new_alerts_by_priority[priority] += 1
+    # Alerts without a known priority count as info
+    priority_counts = new_alerts['priority'].value_counts() if 'priority' in new_alerts.columns else pd.Series(dtype=int)
+    new_alerts_by_priority = {
+        'critical': priority_counts.get('critical', 0),
+        'warning': priority_counts.get('warning', 0),
+    }
+    new_alerts_by_priority['info'] = len(new_alerts) - sum(new_alerts_by_priority.values())
 
     # Play sounds for new alerts (play highest priority only to avoid noise)
     sound_to_play = None
-    if new_alerts_by_priority['critical'] > 0:
+    if new_alerts_by_priority.get('critical', 0) > 0:
         sound_to_play = 'critical'
-    elif new_alerts_by_priority['warning'] > 0:
+    elif new_alerts_by_priority.get('warning', 0) > 0:
         sound_to_play = 'warning'
-    elif new_alerts_by_priority['info'] > 0:
+    elif new_alerts_by_priority.get('info', 0) > 0:
         sound_to_play = 'info'
 
     if sound_to_play:
@@ -527,69 +2320,25 @@ def check_and_play_alert_sounds(df, symbol):
             </script>
         """, height=0)
 
-def show_toast_notifications():
+def show_toast_notifications(alerts):
     """Show toast notifications for new alerts"""
-    # Load recent alerts from both symbols
-    nq_alerts = load_alerts_data("alerts_nq")
-    es_alerts = load_alerts_data("alerts_es")
-
     toasts_html = []
     max_toasts = 3  # Only show up to 3 toasts at once
     toast_count = 0
 
-    # Check NQ alerts
-    if nq_alerts is not None and len(nq_alerts) > 0:
-        for idx, alert in nq_alerts.head(5).iterrows():  # Check most recent 5
-            if toast_count >= max_toasts:
-                break
-
-            alert_id = generate_alert_id("NQ", alert)
-
-            # Skip dismissed or already toasted alerts
-            if alert_id in st.session_state.dismissed_alerts or alert_id in st.session_state.toast_alerts:
-                continue
-
-            # Mark as toasted
-            st.session_state.toast_alerts.add(alert_id)
-
-            # Create toast HTML
-            priority = alert.get('priority', 'info')
-            toast_class = f'toast-{priority}'
-            icon = '🔴' if priority == 'critical' else '🟡' if priority == 'warning' else '🔵'
-
-            price_info = f" @ ${alert['price']:.2f}" if 'price' in alert else ""
-            timestamp_str = alert['timestamp'].strftime('%I:%M:%S %p') if hasattr(alert['timestamp'], 'strftime') else str(alert['timestamp'])
-            alert_type = alert.get('type', 'Alert')
-            message = alert.get('message', 'No message')
-
-            toasts_html.append(f'''
-            <div class="toast {toast_class}">
-                <div class="toast-content">
-                    <span class="toast-icon">{icon}</span>
-                    <div class="toast-text">
-                        <div><strong>NQ - {alert_type}</strong>{price_info}</div>
-                        <div class="toast-time">{timestamp_str}</div>
-                        <div class="toast-message">{message}</div>
-                    </div>
-                </div>
-            </div>
-            ''')
-            toast_count += 1
-
-    # Check ES alerts
-    if es_alerts is not None and len(es_alerts) > 0:
-        for idx, alert in es_alerts.head(5).iterrows():  # Check most recent 5
-            if toast_count >= max_toasts:
-                break
-
-            alert_id = generate_alert_id("ES", alert)
+    for symbol in ALERT_SYMBOLS:
+        window = alerts.window(symbol)
+        if window is None or len(window) == 0 or toast_count >= max_toasts:
+            continue
 
-            # Skip dismissed or already toasted alerts
-            if alert_id in st.session_state.dismissed_alerts or alert_id in st.session_state.toast_alerts:
-                continue
+        # Most recent 5, skipping dismissed or already toasted alerts
+        recent = window.head(5)
+        recent = recent[~st.session_state.dismissed_alerts.isin(recent['alert_id'])
+                        & ~st.session_state.toast_alerts.isin(recent['alert_id'])]
 
+        for idx, alert in recent.head(max_toasts - toast_count).iterrows():
             # Mark as toasted
-            st.session_state.toast_alerts.add(alert_id)
+            st.session_state.toast_alerts.add(alert['alert_id'], alert['timestamp'])
 
             # Create toast HTML
             priority = alert.get('priority', 'info')
@@ -606,7 +2355,7 @@ def show_toast_notifications():
                 <div class="toast-content">
                     <span class="toast-icon">{icon}</span>
                     <div class="toast-text">
-                        <div><strong>ES - {alert_type}</strong>{price_info}</div>
+                        <div><strong>{symbol} - {alert_type}</strong>{price_info}</div>
                         <div class="toast-time">{timestamp_str}</div>
                         <div class="toast-message">{message}</div>
                     </div>
@@ -655,17 +2404,9 @@ def show_toast_notifications():
         components.html(toast_script, height=0)
 
 def get_current_market_status():
-    """Check if market is currently open (9:30 AM - 4:00 PM EST)"""
-    est = pytz.timezone('US/Eastern')
-    now = datetime.now(est)
-
-    market_open = time(9, 30)
-    market_close = time(16, 0)
-
-    is_weekday = now.weekday() < 5
-    is_market_hours = market_open <= now.time() <= market_close
-
-    return is_weekday and is_market_hours, now
+    """Check if market is currently open (9:30 AM - 4:00 PM EST, not on holidays)"""
+    now = datetime.now(MARKET_TZ)
+    return market_phase(now) in SESSION_PHASES, now
 
 def calculate_gap_stats(df, category=None, direction=None, days=252):
     """Calculate gap fill statistics"""
@@ -687,7 +2428,7 @@ def calculate_gap_stats(df, category=None, direction=None, days=252):
     fill_rate = (filled_gaps / total_gaps * 100) if total_gaps > 0 else 0
 
     filled_df = filtered_df[filtered_df['filled'] == True]
-    avg_time_to_fill = filled_df['minutes_to_fill'].mean() if len(filled_df) > 0 else None
+    avg_time_to_fill = filled_df['minutes_to_fill'].astype('float64').mean() if len(filled_df) > 0 else None
 
     return {
         'total_gaps': total_gaps,
@@ -696,6 +2437,99 @@ def calculate_gap_stats(df, category=None, direction=None, days=252):
         'avg_time_to_fill': avg_time_to_fill
     }
 
+# Lookback windows (in gaps, like calculate_gap_stats' days) offered in the gap block; None = all history
+GAP_STAT_WINDOWS = (20, 60, 126, 252, None)
+GAP_STAT_DEFAULT_WINDOW = 252
+
+# Everything render_gap_block shows, precomputed from one version of the gap data.
+# stats maps window -> {(category, direction): calculate_gap_stats-style dict} for the
+# last `window` gaps before today; the (None, None) key holds the same for all gaps.
+GapStatsIndex = namedtuple('GapStatsIndex', ['today', 'stats', 'category_fill', 'direction_fill'])
+
+def _gap_window_stats(history, keys, windows):
+    """calculate_gap_stats for every group and window, from one pass of cumulative sums.
+
+    Rows are walked newest first, so a running sum at a group's k-th row is the
+    total over its last k gaps; each window just picks one row per group.
+    """
+    filled = history['filled'].fillna(False).astype(bool)
+    minutes = history['minutes_to_fill'].where(filled)
+    sums = pd.DataFrame({
+        'filled': filled.astype('int64'),
+        'minutes': minutes.fillna(0).astype('float64'),
+        'timed': minutes.notna().astype('int64'),
+    })
+    newest_first = sums.iloc[::-1]
+
+    if keys:
+        group_keys = [history[key].iloc[::-1] for key in keys]
+        grouped = newest_first.groupby(group_keys, sort=False, observed=True)
+        cumulative = grouped.cumsum()
+        rank = grouped.cumcount().to_numpy() + 1
+        size = grouped['filled'].transform('size').to_numpy()
+        labels = pd.MultiIndex.from_arrays(group_keys).to_numpy()
+    else:
+        cumulative = newest_first.cumsum()
+        rank = np.arange(1, len(newest_first) + 1)
+        size = np.full(len(newest_first), len(newest_first))
+        labels = np.full(len(newest_first), None)
+
+    stats = {}
+    for window in windows:
+        total = size if window is None else np.minimum(size, window)
+        at = rank == total
+        per_window = stats.setdefault(window, {})
+        for label, total_gaps, filled_gaps, minutes_sum, timed in zip(
+                labels[at], total[at], cumulative['filled'].to_numpy()[at],
+                cumulative['minutes'].to_numpy()[at], cumulative['timed'].to_numpy()[at]):
+            if timed:
+                avg_time_to_fill = minutes_sum / timed
+            else:
+                avg_time_to_fill = np.nan if filled_gaps else None
+            per_window[label if keys else (None, None)] = {
+                'total_gaps': total_gaps,
+                'filled_gaps': filled_gaps,
+                'fill_rate': filled_gaps / total_gaps * 100,
+                'avg_time_to_fill': avg_time_to_fill
+            }
+    return stats
+
+def _build_gap_stats_index(df, windows=GAP_STAT_WINDOWS):
+    # Today's gap is the first row on the latest date; history is everything before it
+    today = df.loc[df['date'].idxmax()]
+    history = df[df['date'] < today['date']]
+
+    stats = _gap_window_stats(history, ['category', 'direction'], windows)
+    for window, overall in _gap_window_stats(history, [], windows).items():
+        stats[window].update(overall)
+
+    # Expander charts: fill rate over the whole history
+    category_fill = df.groupby('category', observed=True).agg({
+        'filled': ['count', 'mean']
+    }).reset_index()
+    category_fill.columns = ['Category', 'Total', 'Fill_Rate']
+    category_fill['Fill_Rate'] = category_fill['Fill_Rate'] * 100
+    direction_fill = df.groupby('direction', observed=True)['filled'].mean() * 100
+
+    return GapStatsIndex(today, stats, category_fill, direction_fill)
+
+@st.cache_resource(max_entries=8)
+def build_gap_stats_index(version, _df):
+    """Gap stats index cached per gap data version (the frame itself is not hashed).
+
+    Shared read-only like the poller snapshots: st.cache_data would pickle the
+    GapStatsIndex namedtuple, which `streamlit run` can't unpickle because the
+    class lives in the script's throwaway __main__ module.
+    """
+    return _build_gap_stats_index(_df)
+
+def gap_stats_index(df):
+    """Gap stats index for a loaded gap frame, built once per data version"""
+    version = df.attrs.get('version')
+    if version is None:
+        return _build_gap_stats_index(df)
+    return build_gap_stats_index(version, df)
+
 # ========================================
 # BLOCK 1: RTH GAP STATS
 # ========================================
@@ -708,9 +2542,9 @@ def render_gap_block(df):
         st.warning("No gap data available")
         return
 
-    # Get today's gap
-    latest_date = df['date'].max()
-    today_data = df[df['date'] == latest_date].iloc[0]
+    # Today's gap and every historical stat come from the per-version index
+    index = gap_stats_index(df)
+    today_data = index.today
 
     # Today's gap metrics
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -738,21 +2572,29 @@ def render_gap_block(df):
 
     with col5:
         fill_status = "✅ Filled" if today_data['filled'] else "⏳ Open"
-        fill_time = f"{today_data['minutes_to_fill']} min" if today_data['filled'] and today_data['minutes_to_fill'] else None
+        fill_time = f"{today_data['minutes_to_fill']} min" if today_data['filled'] and pd.notna(today_data['minutes_to_fill']) else None
         st.metric("Fill Status", fill_status, delta=fill_time)
 
     st.markdown("---")
 
+    # Lookback window - every window is precomputed, so switching is just a lookup
+    window = GAP_STAT_WINDOWS[st.radio(
+        "Lookback",
+        range(len(GAP_STAT_WINDOWS)),
+        index=GAP_STAT_WINDOWS.index(GAP_STAT_DEFAULT_WINDOW),
+        format_func=lambda i: "All" if GAP_STAT_WINDOWS[i] is None else f"{GAP_STAT_WINDOWS[i]} Days",
+        horizontal=True,
+        key="gap_stats_window"
+    )]
+    window_stats = index.stats.get(window, {})
+    window_label = "All History" if window is None else f"Last {window} Days"
+
     # Historical stats for similar gaps
     col1, col2 = st.columns(2)
 
     with col1:
-        st.markdown(f"**Similar Gaps ({today_data['category']} {today_data['direction']})**")
-        similar_stats = calculate_gap_stats(
-            df[df['date'] < df['date'].max()],
-            category=today_data['category'],
-            direction=today_data['direction']
-        )
+        st.markdown(f"**Similar Gaps ({today_data['category']} {today_data['direction']}, {window_label})**")
+        similar_stats = window_stats.get((today_data['category'], today_data['direction']))
 
         if similar_stats:
             subcol1, subcol2, subcol3 = st.columns(3)
@@ -762,8 +2604,8 @@ def render_gap_block(df):
                 subcol3.metric("Avg Time", f"{similar_stats['avg_time_to_fill']:.0f} min")
 
     with col2:
-        st.markdown("**All Gaps (Last 252 Days)**")
-        all_stats = calculate_gap_stats(df[df['date'] < df['date'].max()])
+        st.markdown(f"**All Gaps ({window_label})**")
+        all_stats = window_stats.get((None, None))
 
         if all_stats:
             subcol1, subcol2, subcol3 = st.columns(3)
@@ -777,11 +2619,7 @@ def render_gap_block(df):
         tab1, tab2 = st.tabs(["Fill Rate by Category", "Direction Analysis"])
 
         with tab1:
-            category_stats = df.groupby('category').agg({
-                'filled': ['count', 'mean']
-            }).reset_index()
-            category_stats.columns = ['Category', 'Total', 'Fill_Rate']
-            category_stats['Fill_Rate'] = category_stats['Fill_Rate'] * 100
+            category_stats = index.category_fill
 
             fig = go.Figure(data=[
                 go.Bar(x=category_stats['Category'],
@@ -796,7 +2634,7 @@ def render_gap_block(df):
             st.plotly_chart(fig, use_container_width=True)
 
         with tab2:
-            direction_stats = df.groupby('direction')['filled'].mean() * 100
+            direction_stats = index.direction_fill
             fig = go.Figure(data=[
                 go.Bar(x=direction_stats.index,
                        y=direction_stats.values,
@@ -854,14 +2692,15 @@ def render_ib_block(df):
         reached_30 = "✅" if today_ib.get('reached_30', False) else "⏳"
         st.markdown(f"**30% Extension** {reached_30}")
         st.caption(f"Level: {today_ib.get('extension_30_level', 0):.2f}")
-        if today_ib.get('time_to_30'):
-            st.caption(f"Time: {today_ib['time_to_30']} min")
+        time_to_30 = today_ib.get('time_to_30')
+        if pd.notna(time_to_30) and time_to_30:
+            st.caption(f"Time: {time_to_30} min")
 
     with col2:
         reached_50 = "✅" if today_ib.get('reached_50', False) else "⏳"
         st.markdown(f"**50% Extension** {reached_50}")
         st.caption(f"Level: {today_ib.get('extension_50_level', 0):.2f}")
-        if today_ib.get('time_to_50'):
+        if pd.notna(today_ib.get('time_to_50')):
             st.caption(f"Time: {today_ib['time_to_50']} min")
 
     with col3:
@@ -1393,7 +3232,7 @@ def render_tpo_profile_block(data):
 # BLOCK 10: REAL-TIME ALERTS
 # ========================================
 
-def render_alerts_block():
+def render_alerts_block(alerts):
     """Render the Real-Time Alerts block from Sierra Chart studies with NQ/ES side-by-side"""
     st.markdown('<div class="block-header">🚨 Real-Time Alerts</div>', unsafe_allow_html=True)
 
@@ -1413,16 +3252,11 @@ def render_alerts_block():
         with col_btn:
             if st.button("🗑️ Clear All", key="clear_nq", help="Clear all NQ alerts (only for you)", use_container_width=True):
                 # Mark all current NQ alerts as dismissed
-                nq_data = load_alerts_data("alerts_nq")
-                if nq_data is not None:
-                    for idx, alert in nq_data.iterrows():
-                        alert_id = generate_alert_id("NQ", alert)
-                        st.session_state.dismissed_alerts.add(alert_id)
+                alerts.dismiss_all("NQ")
                 st.rerun()
 
-        nq_alerts = load_alerts_data("alerts_nq")
-        check_and_play_alert_sounds(nq_alerts, "NQ")
-        render_alert_feed(nq_alerts, "NQ")
+        alerts.check_sounds("NQ")
+        render_alert_feed(alerts.window("NQ"), "NQ")
 
     # ES Column (Right)
     with col_es:
@@ -1433,46 +3267,30 @@ def render_alerts_block():
         with col_btn:
             if st.button("🗑️ Clear All", key="clear_es", help="Clear all ES alerts (only for you)", use_container_width=True):
                 # Mark all current ES alerts as dismissed
-                es_data = load_alerts_data("alerts_es")
-                if es_data is not None:
-                    for idx, alert in es_data.iterrows():
-                        alert_id = generate_alert_id("ES", alert)
-                        st.session_state.dismissed_alerts.add(alert_id)
+                alerts.dismiss_all("ES")
                 st.rerun()
 
-        es_alerts = load_alerts_data("alerts_es")
-        check_and_play_alert_sounds(es_alerts, "ES")
-        render_alert_feed(es_alerts, "ES")
+        alerts.check_sounds("ES")
+        render_alert_feed(alerts.window("ES"), "ES")
 
 def render_alert_feed_compact(df, symbol):
-    """Render compact alert feed for sidebar"""
+    """Render compact alert feed for sidebar (df is an alert_window frame)"""
     if df is None:
         st.caption(f"⏳ No alerts")
         return
 
-    # Make timestamp timezone-aware if it isn't already
-    est = pytz.timezone('US/Eastern')
-    if df['timestamp'].dt.tz is None:
-        df['timestamp'] = df['timestamp'].dt.tz_localize(est)
-
-    # Sort all alerts by timestamp (most recent first)
-    all_alerts = df.sort_values('timestamp', ascending=False)
-
     # Filter out dismissed alerts (user-specific)
-    filtered_alerts = []
-    for idx, alert in all_alerts.iterrows():
-        alert_id = generate_alert_id(symbol, alert)
-        if alert_id not in st.session_state.dismissed_alerts:
-            filtered_alerts.append((alert_id, alert))
+    filtered_alerts = df[~st.session_state.dismissed_alerts.isin(df['alert_id'])]
 
     if len(filtered_alerts) == 0:
         st.caption(f"No {symbol} alerts")
         return
 
     # Show count by priority - compact
-    critical_count = sum(1 for _, a in filtered_alerts if a.get('priority') == 'critical')
-    warning_count = sum(1 for _, a in filtered_alerts if a.get('priority') == 'warning')
-    info_count = sum(1 for _, a in filtered_alerts if a.get('priority') == 'info')
+    priority_counts = filtered_alerts['priority'].value_counts() if 'priority' in filtered_alerts.columns else pd.Series(dtype=int)
+    critical_count = priority_counts.get('critical', 0)
+    warning_count = priority_counts.get('warning', 0)
+    info_count = priority_counts.get('info', 0)
 
     st.caption(f"🔴 {critical_count} 🟡 {warning_count} 🔵 {info_count}")
 
@@ -1480,10 +3298,11 @@ def render_alert_feed_compact(df, symbol):
     is_expanded = st.session_state.get(f'expanded_{symbol.lower()}_alerts', False)
 
     # Determine how many alerts to show
-    alerts_to_show = filtered_alerts if is_expanded else filtered_alerts[:5]
+    alerts_to_show = filtered_alerts if is_expanded else filtered_alerts.head(5)
 
     # Display alerts - very compact
-    for alert_id, alert in alerts_to_show:
+    for idx, alert in alerts_to_show.iterrows():
+        alert_id = alert['alert_id']
         priority = alert.get('priority', 'info')
         icon = {'critical': '🔴', 'warning': '🟡', 'info': '🔵'}.get(priority, '🔵')
 
@@ -1492,69 +3311,45 @@ def render_alert_feed_compact(df, symbol):
         # Very compact alert display
         alert_text = f"{icon} {alert['timestamp'].strftime('%H:%M')} {alert.get('type', 'Alert')}{price_info}"
 
-        # Checkbox for dismissal
-        if st.checkbox(alert_text, key=f"dismiss_compact_{alert_id}", value=False, label_visibility="visible"):
-            st.session_state.dismissed_alerts.add(alert_id)
-            st.rerun()
+        # Checkbox for dismissal (callbacks run before the panel redraws, so no st.rerun needed)
+        st.checkbox(alert_text, key=f"dismiss_compact_{alert_id}", value=False, label_visibility="visible",
+                    on_change=st.session_state.dismissed_alerts.add, args=(alert_id, alert['timestamp']))
 
     # Show expand/collapse button if more than 5 alerts
+    expanded_key = f'expanded_{symbol.lower()}_alerts'
     if len(filtered_alerts) > 5:
         if is_expanded:
-            if st.button("▲ Show less", key=f"collapse_{symbol.lower()}", use_container_width=True):
-                st.session_state[f'expanded_{symbol.lower()}_alerts'] = False
-                st.rerun()
+            st.button("▲ Show less", key=f"collapse_{symbol.lower()}", use_container_width=True,
+                      on_click=st.session_state.__setitem__, args=(expanded_key, False))
         else:
-            if st.button(f"▼ Show {len(filtered_alerts) - 5} more", key=f"expand_{symbol.lower()}", use_container_width=True):
-                st.session_state[f'expanded_{symbol.lower()}_alerts'] = True
-                st.rerun()
+            st.button(f"▼ Show {len(filtered_alerts) - 5} more", key=f"expand_{symbol.lower()}", use_container_width=True,
+                      on_click=st.session_state.__setitem__, args=(expanded_key, True))
 
 def render_alert_feed(df, symbol):
-    """Render alert feed for a specific symbol"""
+    """Render alert feed for a specific symbol (df is an alert_window frame)"""
     if df is None:
         st.info(f"⏳ Waiting for {symbol} alerts")
         return
 
-    # Make timestamp timezone-aware if it isn't already
-    est = pytz.timezone('US/Eastern')
-    if df['timestamp'].dt.tz is None:
-        df['timestamp'] = df['timestamp'].dt.tz_localize(est)
-
-    # Sort all alerts by timestamp (most recent first)
-    all_alerts = df.sort_values('timestamp', ascending=False)
-
     # Filter out dismissed alerts (user-specific)
-    filtered_alerts = []
-    for idx, alert in all_alerts.iterrows():
-        alert_id = generate_alert_id(symbol, alert)
-        if alert_id not in st.session_state.dismissed_alerts:
-            filtered_alerts.append((alert_id, alert))
-
-    # Convert back to DataFrame
-    alerts_to_show = pd.DataFrame([alert for _, alert in filtered_alerts])
+    filtered_alerts = df[~st.session_state.dismissed_alerts.isin(df['alert_id'])]
 
-    if len(alerts_to_show) == 0:
+    if len(filtered_alerts) == 0:
         st.info(f"No {symbol} alerts available")
         return
 
     # Alert count metrics - more compact for side-by-side (count only non-dismissed)
-    critical_count = 0
-    warning_count = 0
-    info_count = 0
-
-    for _, alert in filtered_alerts:
-        priority = alert.get('priority', 'info')
-        if priority == 'critical':
-            critical_count += 1
-        elif priority == 'warning':
-            warning_count += 1
-        else:
-            info_count += 1
+    priority_counts = filtered_alerts['priority'].value_counts() if 'priority' in filtered_alerts.columns else pd.Series(dtype=int)
+    critical_count = priority_counts.get('critical', 0)
+    warning_count = priority_counts.get('warning', 0)
+    info_count = len(filtered_alerts) - critical_count - warning_count
 
     st.caption(f"🔴 {critical_count} | 🟡 {warning_count} | 🔵 {info_count} | Total: {len(filtered_alerts)}")
     st.markdown("---")
 
     # Display alerts - compact with dismiss button
-    for alert_id, alert in filtered_alerts[:15]:
+    for idx, alert in filtered_alerts.head(15).iterrows():
+        alert_id = alert['alert_id']
         alert_class = {
             'critical': 'alert-critical',
             'warning': 'alert-warning',
@@ -1577,23 +3372,126 @@ def render_alert_feed(df, symbol):
         with col_dismiss:
             # Small X button to dismiss individual alert
             if st.button("×", key=f"dismiss_{alert_id}", help="Dismiss this alert"):
-                st.session_state.dismissed_alerts.add(alert_id)
+                st.session_state.dismissed_alerts.add(alert_id, alert['timestamp'])
                 st.rerun()
 
     # Show alert count
     if len(filtered_alerts) > 15:
         st.caption(f"Showing 15 of {len(filtered_alerts)} alerts")
 
+@st.fragment(run_every=ALERT_PANEL_REFRESH_SECONDS)
+def render_alert_panel():
+    """Sidebar alerts panel: toasts, sounds and the compact NQ/ES feeds.
+
+    Runs as a fragment on its own ALERT_PANEL_REFRESH_SECONDS timer, so new
+    alerts show up within a second without rerunning the stats sections.
+    """
+    # Load every symbol's alerts once for this run
+    timer = SectionTimer('alerts')
+    alerts = AlertContext(timer)
+
+    # Show toast notifications for new alerts
+    show_toast_notifications(alerts)
+
+    st.markdown("### 🚨 Alerts")
+
+    # Current time display
+    is_live_alerts, current_time_alerts = get_current_market_status()
+    st.caption(f"Updated: {current_time_alerts.strftime('%I:%M:%S %p')}")
+
+    # NQ Alerts (Top)
+    st.markdown("**📊 NQ Alerts**")
+    st.button("🗑️ Clear NQ", key="clear_nq_sidebar", use_container_width=True,
+              on_click=alerts.dismiss_all, args=("NQ",))
+
+    alerts.check_sounds("NQ")
+    timer.render("NQ Alerts", lambda: render_alert_feed_compact(alerts.window("NQ"), "NQ"))
+
+    # ES Alerts (Bottom) - no separator, just below NQ
+    st.markdown("")  # Small space
+    st.markdown("**📊 ES Alerts**")
+    st.button("🗑️ Clear ES", key="clear_es_sidebar", use_container_width=True,
+              on_click=alerts.dismiss_all, args=("ES",))
+
+    alerts.check_sounds("ES")
+    timer.render("ES Alerts", lambda: render_alert_feed_compact(alerts.window("ES"), "ES"))
+
+    timer.finish()
+
+# ========================================
+# SECTION REGISTRY
+# ========================================
+
+# A stats section: the sidebar checkbox that shows it, its data dependency (a loader
+# and the JSON file it falls back to) and the block that renders the loaded data
+SectionSpec = namedtuple('SectionSpec', ['key', 'table', 'loader', 'file', 'render'])
+
+# In the sidebar's Show/Hide order
+SECTION_REGISTRY = {
+    "Daily Context": SectionSpec("show_daily_context", 'daily_context', load_daily_context_data, "data/daily_context.json", render_daily_context_block),
+    "Environment": SectionSpec("show_environment", 'market_environment', load_environment_data, "data/market_environment.json", render_environment_block),
+    "Risk Assessment": SectionSpec("show_risk", 'risk_assessment', load_risk_assessment_data, "data/risk_assessment.json", render_risk_assessment_block),
+    "Opening Range": SectionSpec("show_opening_range", 'opening_range', load_opening_range_data, "data/opening_range.json", render_opening_range_block),
+    "Initial Balance": SectionSpec("show_ib", 'ib_details', load_ib_data, "data/ib_details.json", render_ib_block),
+    "3-Stage Progression": SectionSpec("show_stage_progression", 'stage_progression', load_stage_progression_data, "data/stage_progression.json", render_stage_progression_block),
+    "TPO Profile": SectionSpec("show_tpo_profile", 'tpo_profile', load_tpo_profile_data, "data/tpo_profile.json", render_tpo_profile_block),
+    "Single Prints": SectionSpec("show_sp", 'single_prints', load_single_prints_data, "data/single_prints.json", render_single_prints_block),
+    "Gap Stats": SectionSpec("show_gap", 'gap_details', load_gap_data, "data/gap_details.json", render_gap_block),
+}
+
 # ========================================
 # MAIN APP
 # ========================================
 
+def prime_shown_tables():
+    """Fetch every table this run will show in one request before the alert panel and sections load"""
+    if not supabase or not backend_available():
+        return
+    # The visibility checkboxes are drawn later in the run, so read their last values
+    tables = [f"alerts_{symbol.lower()}" for symbol in ALERT_SYMBOLS]
+    tables += [spec.table for spec in SECTION_REGISTRY.values() if st.session_state.get(spec.key, True)]
+    try:
+        get_data_poller().prime(tables)
+    except Exception as e:
+        logger.warning("Supabase prefetch failed, sections will fetch on their own: %s", e)
+
+def render_sections(visibility, gap_file, ib_file, sp_file):
+    """Load and render the visible stats sections in the user's order.
+
+    Hidden sections aren't loaded at all, so their data is never fetched or
+    parsed for this session.
+    """
+    render_backend_status()
+
+    visible_sections = [name for name in st.session_state.section_order
+                        if name in SECTION_REGISTRY and visibility.get(name)]
+    files = {"Gap Stats": gap_file, "Initial Balance": ib_file, "Single Prints": sp_file}
+
+    # Load data files concurrently, each with its own timeout (timed per section for the timings panel)
+    timer = SectionTimer('sections')
+    loaded = get_section_loader().load_all(timer, {
+        name: (SECTION_REGISTRY[name].loader, Path(__file__).parent / files.get(name, SECTION_REGISTRY[name].file))
+        for name in visible_sections
+    })
+
+    # Render sections in order
+    for idx, section_name in enumerate(visible_sections):
+        result = loaded[section_name]
+        if result.stale:
+            render_stale_badge(result)
+        else:
+            render_data_age(result)
+        timer.render(section_name, functools.partial(SECTION_REGISTRY[section_name].render, result.data))
+
+        # Only add spacing between sections, not after the last one
+        if idx < len(visible_sections) - 1:
+            st.markdown("<br>", unsafe_allow_html=True)
+
+    timer.finish()
+
 def main():
     st.markdown('<h1 class="main-header">NQ/ES Trading Stats Dashboard</h1>', unsafe_allow_html=True)
 
-    # Show toast notifications for new alerts
-    show_toast_notifications()
-
     # Top status bar
     col1, col2, col3 = st.columns([2, 1, 1])
     is_live, current_time = get_current_market_status()
@@ -1601,8 +3499,12 @@ def main():
     with col1:
         st.markdown(f"### 📅 {current_time.strftime('%A, %B %d, %Y')}")
     with col2:
+        phase = market_phase(current_time)
         if is_live:
-            st.markdown('<span class="live-indicator">🔴 MARKET OPEN</span>', unsafe_allow_html=True)
+            st.markdown(f'<span class="live-indicator">🔴 MARKET OPEN</span> · {MARKET_PHASE_LABELS[phase]}',
+                        unsafe_allow_html=True)
+        elif phase == 'premarket':
+            st.markdown("🟡 **Pre-Market**")
         else:
             st.markdown("⚪ **Market Closed**")
     with col3:
@@ -1610,53 +3512,12 @@ def main():
 
     st.markdown("---")
 
+    prime_shown_tables()
+
     # Sidebar
     with st.sidebar:
-        # ALERTS SECTION AT TOP
-        st.markdown("### 🚨 Alerts")
-
-        # Current time display
-        is_live_alerts, current_time_alerts = get_current_market_status()
-        st.caption(f"Updated: {current_time_alerts.strftime('%I:%M:%S %p')}")
-
-        # NQ Alerts (Top)
-        st.markdown("**📊 NQ Alerts**")
-        if st.button("🗑️ Clear NQ", key="clear_nq_sidebar", use_container_width=True):
-            nq_data = load_alerts_data("alerts_nq")
-            if nq_data is not None:
-                # Make timestamp timezone-aware to match render function
-                est = pytz.timezone('US/Eastern')
-                if nq_data['timestamp'].dt.tz is None:
-                    nq_data['timestamp'] = nq_data['timestamp'].dt.tz_localize(est)
-
-                for idx, alert in nq_data.iterrows():
-                    alert_id = generate_alert_id("NQ", alert)
-                    st.session_state.dismissed_alerts.add(alert_id)
-            st.rerun()
-
-        nq_alerts = load_alerts_data("alerts_nq")
-        check_and_play_alert_sounds(nq_alerts, "NQ")
-        render_alert_feed_compact(nq_alerts, "NQ")
-
-        # ES Alerts (Bottom) - no separator, just below NQ
-        st.markdown("")  # Small space
-        st.markdown("**📊 ES Alerts**")
-        if st.button("🗑️ Clear ES", key="clear_es_sidebar", use_container_width=True):
-            es_data = load_alerts_data("alerts_es")
-            if es_data is not None:
-                # Make timestamp timezone-aware to match render function
-                est = pytz.timezone('US/Eastern')
-                if es_data['timestamp'].dt.tz is None:
-                    es_data['timestamp'] = es_data['timestamp'].dt.tz_localize(est)
-
-                for idx, alert in es_data.iterrows():
-                    alert_id = generate_alert_id("ES", alert)
-                    st.session_state.dismissed_alerts.add(alert_id)
-            st.rerun()
-
-        es_alerts = load_alerts_data("alerts_es")
-        check_and_play_alert_sounds(es_alerts, "ES")
-        render_alert_feed_compact(es_alerts, "ES")
+        # ALERTS SECTION AT TOP (live fragment, includes toasts and sounds)
+        render_alert_panel()
 
         st.markdown("---")
 
@@ -1727,9 +3588,12 @@ def main():
         st.markdown("### 🔄 Refresh")
         if st.button("🔄 Refresh Now", use_container_width=True):
             st.cache_data.clear()
+            get_swr_cache().clear()
             st.rerun()
 
         enable_auto_refresh = st.checkbox("Enable Auto-Refresh", value=False)
+        st.checkbox("⏱️ Show Section Timings", value=False, key="show_section_timings",
+                    help="Per-section load/render times and cache hits, also logged to the metrics file")
 
         if enable_auto_refresh:
             refresh_interval = st.selectbox(
@@ -1738,21 +3602,16 @@ def main():
                 format_func=lambda x: f"{x} seconds",
                 index=0
             )
-            st.caption(f"⏱️ Will refresh every {refresh_interval} sec")
+            st.caption(f"⏱️ Sections refresh every {refresh_interval} sec (alerts every {ALERT_PANEL_REFRESH_SECONDS} sec)")
 
         st.markdown("---")
 
         # Visibility toggles
         st.markdown("### 👁️ Show/Hide Sections")
-        show_daily_context = st.checkbox("Daily Context", value=True, key="show_daily_context")
-        show_environment = st.checkbox("Environment", value=True, key="show_environment")
-        show_risk = st.checkbox("Risk Assessment", value=True, key="show_risk")
-        show_opening_range = st.checkbox("Opening Range", value=True, key="show_opening_range")
-        show_ib = st.checkbox("Initial Balance", value=True, key="show_ib")
-        show_stage_progression = st.checkbox("3-Stage Progression", value=True, key="show_stage_progression")
-        show_tpo_profile = st.checkbox("TPO Profile", value=True, key="show_tpo_profile")
-        show_sp = st.checkbox("Single Prints", value=True, key="show_sp")
-        show_gap = st.checkbox("Gap Stats", value=True, key="show_gap")
+        visibility = {
+            name: st.checkbox(name, value=True, key=spec.key)
+            for name, spec in SECTION_REGISTRY.items()
+        }
 
         st.markdown("---")
 
@@ -1786,47 +3645,15 @@ def main():
         st.caption("Built with Streamlit")
         st.caption("🔧 Version: 2.3 - Clear Button Fixed")
 
-    # Load data files
-    gap_df = load_gap_data(Path(__file__).parent / gap_file)
-    ib_df = load_ib_data(Path(__file__).parent / ib_file)
-    sp_df = load_single_prints_data(Path(__file__).parent / sp_file)
-    environment_data = load_environment_data(Path(__file__).parent / "data/market_environment.json")
-    risk_data = load_risk_assessment_data(Path(__file__).parent / "data/risk_assessment.json")
-    daily_context_data = load_daily_context_data(Path(__file__).parent / "data/daily_context.json")
-    opening_range_data = load_opening_range_data(Path(__file__).parent / "data/opening_range.json")
-    stage_progression_data = load_stage_progression_data(Path(__file__).parent / "data/stage_progression.json")
-    tpo_profile_data = load_tpo_profile_data(Path(__file__).parent / "data/tpo_profile.json")
-
-    # Section mapping with visibility
-    section_config = {
-        "Daily Context": (show_daily_context, lambda: render_daily_context_block(daily_context_data)),
-        "Environment": (show_environment, lambda: render_environment_block(environment_data)),
-        "Risk Assessment": (show_risk, lambda: render_risk_assessment_block(risk_data)),
-        "Opening Range": (show_opening_range, lambda: render_opening_range_block(opening_range_data)),
-        "Initial Balance": (show_ib, lambda: render_ib_block(ib_df)),
-        "3-Stage Progression": (show_stage_progression, lambda: render_stage_progression_block(stage_progression_data)),
-        "TPO Profile": (show_tpo_profile, lambda: render_tpo_profile_block(tpo_profile_data)),
-        "Single Prints": (show_sp, lambda: render_single_prints_block(sp_df)),
-        "Gap Stats": (show_gap, lambda: render_gap_block(gap_df))
-    }
-
-    # Render sections in order - only render visible sections once
-    visible_sections = [s for s in st.session_state.section_order
-                       if s in section_config and section_config[s][0]]
-
-    for idx, section_name in enumerate(visible_sections):
-        _, render_func = section_config[section_name]
-        render_func()
-
-        # Only add spacing between sections, not after the last one
-        if idx < len(visible_sections) - 1:
-            st.markdown("<br>", unsafe_allow_html=True)
+    # Stats sections rerun on their own timer when auto-refresh is on, without
+    # holding the script thread; the alert panel keeps its 1 s cadence regardless
+    sections = st.fragment(render_sections, run_every=refresh_interval if enable_auto_refresh else None)
+    sections(visibility, gap_file, ib_file, sp_file)
 
-    # Auto-refresh ONLY if enabled
-    if enable_auto_refresh:
-        import time
-        time.sleep(refresh_interval)
-        st.rerun()
+    # Timings panel last, so a full rerun shows its own numbers
+    if st.session_state.get('show_section_timings'):
+        with st.sidebar:
+            render_timing_panel()
 
 if __name__ == "__main__":
     main()